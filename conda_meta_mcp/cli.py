@@ -1,10 +1,10 @@
 import argparse
 
-from .mcp_json import setup_mcp_json
-from .server import setup_run
-
 
 def main(argv=None):
+    from .mcp_json import setup_mcp_json
+    from .server import setup_run
+
     parser = argparse.ArgumentParser(prog="cmm")
     subparser = parser.add_subparsers(help="sub-command help", dest="command")
     subparser.required = True
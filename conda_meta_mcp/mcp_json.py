@@ -31,4 +31,5 @@ def run_mcp_json(args):
             "env": {},
         }
     }
-    print(json.dumps(config, indent=2))
+    json.dump(config, sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -1,24 +1,31 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
 import contextlib
 import importlib
 import os
 import sys
-
-from fastmcp import FastMCP
+from typing import TYPE_CHECKING
 
 from conda_meta_mcp.parent_watcher import (
     PARENT_WATCHER_ENV,
     env_enabled,
     start_parent_watcher,
 )
+from conda_meta_mcp.warmup import WARMUP_ENV, parse_warmup_pairs, start_warmup
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from fastmcp import FastMCP
 
 SERVICE_NAME = "Conda ECO System Meta Data MCP"
 
 _periodic_cleanup_task: asyncio.Task | None = None
 
+# Configured servers by code-mode flag; tool registration only has to happen once
+_SERVER_CACHE: dict[bool, FastMCP] = {}
+
 
 def _build_code_mode_transform():
     code_mode = importlib.import_module("fastmcp.experimental.transforms.code_mode")
@@ -54,6 +61,15 @@ def setup_run(subparser: argparse._SubParsersAction):
         default=env_enabled(PARENT_WATCHER_ENV, default=True),
         help="Exit when the launcher parent process disappears (default: enabled)",
     )
+    run_parser.add_argument(
+        "--warmup",
+        metavar="CHANNEL/PLATFORM,...",
+        default=os.getenv(WARMUP_ENV, ""),
+        help=(
+            "Load the repodata of these channel/platform pairs in the background at startup, "
+            f"e.g. conda-forge/linux-64 (default: ${WARMUP_ENV})"
+        ),
+    )
     run_parser.set_defaults(func=run_cmd)
 
 
@@ -63,6 +79,7 @@ def run_cmd(args):
     if getattr(args, "parent_watcher", True):
         start_parent_watcher()
     mcp = setup_server(args.code)
+    start_warmup(parse_warmup_pairs(getattr(args, "warmup", None)))
 
     run_kwargs = {"transport": args.transport, "show_banner": False}
     if args.port is not None:
@@ -72,7 +89,17 @@ def run_cmd(args):
 
 
 def setup_server(code=False) -> FastMCP:
-    from conda_meta_mcp.tools import discover_tools
+    code = bool(code)
+    cached = _SERVER_CACHE.get(code)
+    if cached is not None:
+        return cached
+
+    # Imported lazily so that `cmm --help` / `cmm mcp-json` skip the asyncio / fastmcp import cost
+    import asyncio
+
+    from fastmcp import FastMCP
+
+    from conda_meta_mcp.tools import discover_resources, discover_tools
     from conda_meta_mcp.tools.cache_utils import clear_external_library_caches
 
     global _periodic_cleanup_task
@@ -86,6 +113,13 @@ def setup_server(code=False) -> FastMCP:
         tool_name = getattr(tool_fn, "__mcp_tool_name__", default_name)
         instance.tool(tool_fn, name=tool_name)
 
+    for resource_fn in discover_resources():
+        instance.resource(
+            resource_fn.__mcp_resource_uri__,
+            name=resource_fn.__mcp_resource_name__,
+            mime_type=resource_fn.__mcp_resource_mime_type__,
+        )(resource_fn)
+
     async def periodic_cleanup():
         """Periodically clear external library caches to prevent memory growth."""
         while True:
@@ -96,6 +130,7 @@ def setup_server(code=False) -> FastMCP:
         asyncio.get_running_loop()
         _periodic_cleanup_task = asyncio.create_task(periodic_cleanup())
 
+    _SERVER_CACHE[code] = instance
     return instance
 
 
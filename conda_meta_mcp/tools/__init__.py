@@ -1,5 +1,23 @@
 """Tool discovery and registration for conda-meta-mcp."""
 
-from .discovery import discover_tools
+from __future__ import annotations
 
-__all__ = ["discover_tools"]
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .discovery import discover_resources, discover_tools
+
+__all__ = ["discover_resources", "discover_tools"]
+
+# Public name -> submodule providing it; resolved on first attribute access (PEP 562)
+_LAZY_ATTRS = {"discover_resources": ".discovery", "discover_tools": ".discovery"}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,90 @@
+"""
+Small persistent key/value cache shared across server processes.
+
+Entries are stored as JSON in one SQLite file per cache below the user cache
+directory (override via the CONDA_META_MCP_CACHE_DIR environment variable).
+All operations are best-effort: a cache that cannot be read or written behaves
+like an empty cache.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing, suppress
+from pathlib import Path
+from typing import Any
+
+from .cache_utils import register_persistent_cache_clearer
+
+CACHE_DIR_ENV = "CONDA_META_MCP_CACHE_DIR"
+
+
+def cache_dir() -> Path:
+    """Return the directory holding the on-disk caches."""
+    override = os.getenv(CACHE_DIR_ENV)
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = Path(os.getenv("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "conda-meta-mcp"
+
+
+class DiskCache:
+    """JSON values in a SQLite table, expiring after ``ttl`` seconds."""
+
+    def __init__(self, name: str, ttl: float) -> None:
+        self.name = name
+        self.ttl = ttl
+        register_persistent_cache_clearer(self.clear)
+
+    @property
+    def path(self) -> Path:
+        return cache_dir() / f"{self.name}.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, stored REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for key, or None if missing or expired."""
+        with suppress(sqlite3.Error, OSError, ValueError), closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND stored >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+            if row is not None:
+                return json.loads(row[0])
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value and drop expired entries."""
+        with suppress(sqlite3.Error, OSError, TypeError, ValueError):
+            payload = json.dumps(value)
+            now = time.time()
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM entries WHERE stored < ?", (now - self.ttl,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, stored, value) VALUES (?, ?, ?)",
+                    (key, now, payload),
+                )
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        if not self.path.exists():
+            return
+        with suppress(sqlite3.Error, OSError), closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries")
@@ -0,0 +1,49 @@
+"""
+Dedicated thread pool for the blocking parts of tool calls.
+
+Tools offload their synchronous helpers here instead of ``asyncio.to_thread`` so
+that a burst of slow calls (network, solver) is bounded by one pool owned by the
+server and threads are reused rather than competing with other users of the
+event loop's default executor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+MAX_WORKERS = 32
+
+_POOL = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="mcp-tool")
+
+# (event loop, caller key) -> the pending call that concurrent duplicates wait on
+_INFLIGHT: dict[tuple[asyncio.AbstractEventLoop, Hashable], asyncio.Future[Any]] = {}
+
+
+async def run_blocking(fn: Callable[..., Any], /, *args: Any) -> Any:
+    """Run ``fn(*args)`` in the tool thread pool, keeping the caller's contextvars."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_POOL, functools.partial(ctx.run, fn, *args))
+
+
+async def run_blocking_once(fn: Callable[..., Any], /, *args: Hashable) -> Any:
+    """Like run_blocking, but concurrent calls with equal ``(fn, args)`` share a single run.
+
+    Callers arriving while an identical call is still running await its result (or
+    exception) instead of occupying another worker; one caller being cancelled does not
+    cancel the shared call for the others.
+    """
+    flight_key = (asyncio.get_running_loop(), (fn, args))
+    future = _INFLIGHT.get(flight_key)
+    if future is None:
+        future = asyncio.ensure_future(run_blocking(fn, *args))
+        _INFLIGHT[flight_key] = future
+        future.add_done_callback(lambda _: _INFLIGHT.pop(flight_key, None))
+    return await asyncio.shield(future)
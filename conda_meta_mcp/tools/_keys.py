@@ -0,0 +1,13 @@
+"""Parsing of the comma-separated ``get_keys`` field filter shared by the tools."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def parse_keys(get_keys: str | None) -> frozenset[str]:
+    """Return the field names in a comma-separated get_keys string (empty if none)."""
+    if not get_keys:
+        return frozenset()
+    return frozenset(k.strip() for k in get_keys.split(",") if k.strip())
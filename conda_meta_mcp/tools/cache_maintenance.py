@@ -2,16 +2,17 @@
 
 from __future__ import annotations
 
-from .cache_utils import clear_external_library_caches
+from .cache_utils import clear_external_library_caches, clear_persistent_caches
 from .registry import register_tool
 
 
 @register_tool
 async def cache_maintenance() -> str:
     """
-    Run cache maintenance for all registered external and tool-level caches.
+    Run cache maintenance for all registered external, tool-level and on-disk caches.
 
     Returns a short status message after cleanup has been triggered.
     """
     clear_external_library_caches()
-    return "External and tool-level caches cleared."
+    clear_persistent_caches()
+    return "External, tool-level and on-disk caches cleared."
@@ -2,23 +2,209 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import functools
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
 from contextlib import suppress
-from typing import TypeVar
+from typing import Any, TypeVar
 
 F = TypeVar("F", bound=Callable)
 
+log = logging.getLogger(__name__)
+
 ExternalCacheClearer = Callable[[], None]
-_external_cache_clearers: list[ExternalCacheClearer] = []
+# Insertion-ordered sets: registering the same clearer again (re-imports, repeated
+# setup in tests) must not make cache maintenance run it twice.
+_external_cache_clearers: dict[ExternalCacheClearer, None] = {}
+_persistent_cache_clearers: dict[ExternalCacheClearer, None] = {}
 
 
 def register_external_cache_clearer(clearer: ExternalCacheClearer) -> None:
     """Register a callback that clears external or tool-level caches."""
-    _external_cache_clearers.append(clearer)
+    _external_cache_clearers[clearer] = None
+
+
+def register_persistent_cache_clearer(clearer: ExternalCacheClearer) -> None:
+    """Register a callback that clears an on-disk cache.
+
+    These are only run by the cache_maintenance tool, not by the periodic in-memory
+    cleanup, so that persisted entries survive long-running servers.
+    """
+    _persistent_cache_clearers[clearer] = None
 
 
 def clear_external_library_caches() -> None:
     """Call all registered cache clearers (best-effort; ignore their errors)."""
-    for clearer in list(_external_cache_clearers):
+    for clearer in _external_cache_clearers:
         with suppress(Exception):
             clearer()
+
+
+def clear_persistent_caches() -> None:
+    """Call all registered on-disk cache clearers (best-effort; ignore their errors)."""
+    for clearer in _persistent_cache_clearers:
+        with suppress(Exception):
+            clearer()
+
+
+def env_bytes(name: str, *, default: int) -> int:
+    """Read a positive byte limit from the environment variable ``name``.
+
+    Invalid or non-positive values are reported and replaced by ``default``, so a typo
+    such as "64MB" does not keep the server from starting.
+    """
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        parsed = 0
+    if parsed <= 0:
+        log.warning("Ignoring %s=%r (expected a positive number of bytes)", name, value)
+        return default
+    return parsed
+
+
+class ByteBudget:
+    """A maxbytes limit shared by several peekable caches.
+
+    Entries are evicted least recently used first across all caches on the budget, so
+    one cache filling up displaces cold entries of the others instead of adding to the
+    total. The caches share the budget's lock.
+    """
+
+    def __init__(self, maxbytes: int) -> None:
+        self.maxbytes = maxbytes
+        self.lock = threading.Lock()
+        self._entries: OrderedDict[tuple[_PeekableLRUCache, Hashable], int] = OrderedDict()
+        self._bytes = 0
+
+    def nbytes(self) -> int:
+        """Total size of the entries of all caches on this budget."""
+        return self._bytes
+
+    # The methods below are called with self.lock held.
+
+    def _add(self, cache: _PeekableLRUCache, key: Hashable, size: int) -> None:
+        self._bytes += size - self._entries.pop((cache, key), 0)
+        self._entries[cache, key] = size
+
+    def _touch(self, cache: _PeekableLRUCache, key: Hashable) -> None:
+        if (cache, key) in self._entries:
+            self._entries.move_to_end((cache, key))
+
+    def _remove(self, cache: _PeekableLRUCache, key: Hashable) -> None:
+        self._bytes -= self._entries.pop((cache, key), 0)
+
+    def _shrink(self) -> None:
+        while self._entries and self._bytes > self.maxbytes:
+            (cache, key), size = self._entries.popitem(last=False)
+            self._bytes -= size
+            cache._forget(key)
+
+
+class _PeekableLRUCache:
+    """Size-bounded LRU memoization that can be queried without computing."""
+
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        maxsize: int,
+        sizeof: Callable[[Any], int] | None = None,
+        maxbytes: int | None = None,
+        budget: ByteBudget | None = None,
+    ) -> None:
+        functools.update_wrapper(self, fn)
+        if budget is None and maxbytes is not None:
+            budget = ByteBudget(maxbytes)
+        self._fn = fn
+        self._maxsize = maxsize
+        self._sizeof = sizeof
+        self._budget = budget
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._sizes: dict[Hashable, int] = {}
+        self._bytes = 0
+        self._lock = budget.lock if budget is not None else threading.Lock()
+
+    def cache_peek(self, *args: Hashable) -> Any | None:
+        """Return the cached result for args, or None on a miss (never computes)."""
+        with self._lock:
+            value = self._data.get(args)
+            if value is not None:
+                self._data.move_to_end(args)
+                if self._budget is not None:
+                    self._budget._touch(self, args)
+            return value
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            if self._budget is not None:
+                for key in self._data:
+                    self._budget._remove(self, key)
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def cache_bytes(self) -> int:
+        """Total sizeof() of the cached results (0 without a sizeof function)."""
+        return self._bytes
+
+    def _forget(self, key: Hashable) -> None:
+        del self._data[key]
+        self._bytes -= self._sizes.pop(key, 0)
+
+    def _evict_oldest(self) -> None:
+        key = next(iter(self._data))
+        self._forget(key)
+        if self._budget is not None:
+            self._budget._remove(self, key)
+
+    def __call__(self, *args: Hashable) -> Any:
+        value = self.cache_peek(*args)
+        if value is None:
+            value = self._fn(*args)
+            size = self._sizeof(value) if self._sizeof is not None else 0
+            if self._budget is not None and size > self._budget.maxbytes:
+                return value
+            with self._lock:
+                self._bytes += size - self._sizes.get(args, 0)
+                self._sizes[args] = size
+                self._data[args] = value
+                self._data.move_to_end(args)
+                if self._budget is not None:
+                    self._budget._add(self, args, size)
+                while len(self._data) > self._maxsize:
+                    self._evict_oldest()
+                if self._budget is not None:
+                    self._budget._shrink()
+        return value
+
+
+def peekable_lru_cache(
+    maxsize: int,
+    *,
+    sizeof: Callable[[Any], int] | None = None,
+    maxbytes: int | None = None,
+    budget: ByteBudget | None = None,
+) -> Callable[[Callable[..., Any]], _PeekableLRUCache]:
+    """
+    Like functools.lru_cache (positional arguments only), plus cache_peek(*args).
+
+    Async tool handlers use cache_peek to answer cache hits directly on the event loop
+    and only offload misses to a worker thread. Cached results must not be None.
+
+    With ``sizeof`` and ``maxbytes``, least recently used results are also evicted while
+    their summed sizes exceed ``maxbytes``; a single result larger than that is not cached.
+    Pass a ``budget`` instead of ``maxbytes`` to share one limit between several caches.
+    """
+    if maxbytes is not None and budget is not None:
+        raise TypeError("pass either maxbytes or budget, not both")
+
+    def _decorate(fn: Callable[..., Any]) -> _PeekableLRUCache:
+        return _PeekableLRUCache(fn, maxsize, sizeof=sizeof, maxbytes=maxbytes, budget=budget)
+
+    return _decorate
@@ -6,15 +6,22 @@ Currently based on https://github.com/praiskup/argparse-manpage
 
 from __future__ import annotations
 
-import asyncio
+import bisect
+import itertools
 import re
-from functools import cache
-from typing import Any
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from fastmcp.exceptions import ToolError
 
+from ._disk_cache import DiskCache
+from ._executor import run_blocking
 from .registry import register_tool
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
 DISABLED_MESSAGE = "Disabled, enable via installing the package argparse-manpage"
 
 Manpage: Any | None
@@ -26,36 +33,129 @@ except ImportError:
 else:
     Manpage = _Manpage
 
+# Rendering walks every conda sub-command, so the result is also persisted across restarts
+_HELP_DISK_CACHE = DiskCache("cli_help", ttl=7 * 24 * 60 * 60)
+
+_CACHED_HELP: str | None = None
+_CACHED_INDEX: _HelpIndex | None = None
+
+# Anchors, lookarounds and inline flags can behave differently on the joined buffer
+_BUFFER_UNSAFE_GREP = re.compile(r"\\[AZ]|\(\?")
+
+
+def _conda_help_cache_key() -> str:
+    """Key covering everything that shapes the rendered help, including conda plugins."""
+    from importlib.metadata import entry_points, version
+
+    from conda import __version__ as conda_version
+
+    plugins = sorted(
+        {f"{ep.dist.name}=={ep.dist.version}" for ep in entry_points(group="conda") if ep.dist}
+    )
+    return "|".join([sys.prefix, conda_version, version("argparse-manpage"), *plugins])
+
 
-@cache
 def _get_conda_help() -> str:
-    from conda.cli.conda_argparse import generate_parser
+    global _CACHED_HELP
+    if _CACHED_HELP is None:
+        if Manpage is None:
+            raise ToolError(DISABLED_MESSAGE)
+
+        key = _conda_help_cache_key()
+        help_text = _HELP_DISK_CACHE.get(key)
+        if help_text is None:
+            from conda.cli.conda_argparse import generate_parser
+
+            help_text = str(Manpage(generate_parser(add_help=True)))
+            _HELP_DISK_CACHE.set(key, help_text)
+        _CACHED_HELP = help_text
+    return _CACHED_HELP
+
+
+class _HelpIndex(NamedTuple):
+    """Help text split into lines, plus the joined buffer and line offsets used by grep."""
+
+    lines: tuple[str, ...]
+    text: str
+    starts: list[int]
+
+    @classmethod
+    def from_text(cls, help_text: str) -> _HelpIndex:
+        lines = tuple(help_text.splitlines())
+        starts = list(itertools.accumulate((len(line) + 1 for line in lines[:-1]), initial=0))
+        return cls(lines, "\n".join(lines), starts)
 
-    if Manpage is None:
-        raise ToolError(DISABLED_MESSAGE)
 
-    return str(Manpage(generate_parser(add_help=True)))
+def _get_conda_help_index() -> _HelpIndex:
+    global _CACHED_INDEX
+    if _CACHED_INDEX is None:
+        _CACHED_INDEX = _HelpIndex.from_text(_get_conda_help())
+    return _CACHED_INDEX
+
+
+def _clear_conda_help_cache() -> None:
+    global _CACHED_HELP, _CACHED_INDEX
+    _CACHED_HELP = None
+    _CACHED_INDEX = None
+
+
+# Tool name -> provider of its (cached) help index
+_HELP_PROVIDERS: dict[str, Callable[[], _HelpIndex]] = {
+    "conda": _get_conda_help_index,
+}
+
+
+@lru_cache(maxsize=64)
+def _compile_grep(grep: str) -> re.Pattern[str]:
+    try:
+        return re.compile(grep, re.IGNORECASE | re.MULTILINE)
+    except re.error as e:
+        raise ToolError(f"Invalid regex pattern: {e}") from e
+
+
+def _grep_lines(index: _HelpIndex, grep: str) -> list[str]:
+    """
+    Return the lines matching grep.
+
+    Instead of calling the pattern once per line, the joined buffer is scanned and each
+    match is mapped back to its line via bisect, so lines without a match cost nothing.
+    """
+    pattern = _compile_grep(grep)
+    lines, text, starts = index
+    if not lines:
+        return []
+    if _BUFFER_UNSAFE_GREP.search(grep):
+        return [line for line in lines if pattern.search(line)]
+
+    matched = []
+    pos = 0
+    while (m := pattern.search(text, pos)) is not None:
+        i = bisect.bisect_right(starts, m.start()) - 1
+        line = lines[i]
+        # A match spanning a newline does not count; re-check that line on its own
+        if m.end() <= starts[i] + len(line) or pattern.search(line):
+            matched.append(line)
+        if i + 1 >= len(lines):
+            break
+        pos = starts[i + 1]
+    return matched
 
 
 def _cli_help(tool: str = "conda", limit: int = 0, offset: int = 0, grep: str = "") -> str:
-    match tool:
-        case "conda":
-            lines = _get_conda_help().splitlines()
-
-            # Apply regex filtering if grep is provided
-            if grep and grep.strip():
-                try:
-                    pattern = re.compile(grep, re.IGNORECASE)
-                    lines = [line for line in lines if pattern.search(line)]
-                except re.error as e:
-                    raise ToolError(f"Invalid regex pattern: {e}") from e
-
-            # Apply pagination
-            offset = max(offset or 0, 0)
-            lines = lines[offset : offset + limit] if limit and limit > 0 else lines[offset:]
-            return "\n".join(lines)
-        case _:
-            raise ToolError(f"Unknown/ not yet implemented tool: {tool}")
+    provider = _HELP_PROVIDERS.get(tool)
+    if provider is None:
+        raise ToolError(f"Unknown/ not yet implemented tool: {tool}")
+    index = provider()
+    lines: Sequence[str] = index.lines
+
+    # Apply regex filtering if grep is provided
+    if grep and grep.strip():
+        lines = _grep_lines(index, grep)
+
+    # Apply pagination
+    offset = max(offset or 0, 0)
+    lines = lines[offset : offset + limit] if limit and limit > 0 else lines[offset:]
+    return "\n".join(lines)
 
 
 @register_tool
@@ -79,7 +179,11 @@ async def cli_help(tool: str = "conda", limit: int = 0, offset: int = 0, grep: s
       A string with the help text
     """
     try:
-        return await asyncio.to_thread(_cli_help, tool, limit, offset, grep)
+        # Once the help is cached, plain paging is cheap enough for the event loop; user
+        # supplied regexes stay offloaded so a slow pattern cannot block other requests
+        if tool == "conda" and _CACHED_INDEX is not None and not (grep and grep.strip()):
+            return _cli_help(tool, limit, offset, grep)
+        return await run_blocking(_cli_help, tool, limit, offset, grep)
     except ToolError:
         raise
     except ValueError as ve:
@@ -1,34 +1,52 @@
 from __future__ import annotations
 
 import importlib
-import pkgutil
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
-from .registry import AVAILABLE_TOOLS
+from .registry import AVAILABLE_RESOURCES, AVAILABLE_TOOLS
+
+# Modules defining @register_tool / @register_resource functions. Listed statically so
+# startup does not scan the package directory; tests assert this stays in sync.
+TOOL_MODULES = (
+    "cache_maintenance",
+    "cli_help",
+    "file_path_search",
+    "import_mapping",
+    "info",
+    "pkg_insights",
+    "pkg_search",
+    "pypi_to_conda",
+    "repoquery",
+)
+
+
+def _import_tool_modules() -> None:
+    for mod_name in TOOL_MODULES:
+        importlib.import_module(f"{__package__}.{mod_name}")
 
 
 def discover_tools() -> list[Callable[..., Any]]:
     """
-    Automatically import all tools so that @register_tool decorators run
+    Import all tool modules so that @register_tool decorators run
     and populate AVAILABLE_TOOLS.
 
     Returns:
         A list of all registered MCP tool functions.
     """
-    pkg_name = "conda_meta_mcp.tools"
-    pkg = importlib.import_module(pkg_name)
+    _import_tool_modules()
+    return sorted(AVAILABLE_TOOLS, key=lambda fn: getattr(fn, "__mcp_tool_name__", fn.__name__))
 
-    for mod_info in pkgutil.walk_packages(pkg.__path__, pkg_name + "."):
-        # Skip private modules and this discovery module itself
-        mod_basename = mod_info.name.rsplit(".", 1)[-1]
-        if mod_basename.startswith("_"):
-            continue
-        if mod_basename in ("registry", "discovery"):
-            continue
 
-        importlib.import_module(mod_info.name)
+def discover_resources() -> list[Callable[..., Any]]:
+    """
+    Import all tool modules so that @register_resource decorators run
+    and populate AVAILABLE_RESOURCES.
 
-    return sorted(AVAILABLE_TOOLS, key=lambda fn: getattr(fn, "__mcp_tool_name__", fn.__name__))
+    Returns:
+        A list of all registered MCP resource functions, ordered by URI.
+    """
+    _import_tool_modules()
+    return sorted(AVAILABLE_RESOURCES, key=lambda fn: fn.__mcp_resource_uri__)
@@ -1,39 +1,64 @@
-import asyncio
-from functools import lru_cache
+from operator import itemgetter
 
 import requests
 from fastmcp.exceptions import ToolError
+from pydantic_core import from_json
 
+from .. import APP_VERSION
 from ._channels import require_conda_forge_channel
+from ._disk_cache import DiskCache
+from ._executor import run_blocking
+from .cache_utils import peekable_lru_cache
 from .registry import register_tool
 
+# Persist successful lookups across server restarts; the in-process LRU stays as L1
+_DISK_CACHE = DiskCache("file_path_search", ttl=24 * 60 * 60)
 
-@lru_cache(maxsize=1024)
-def _file_path_search_raw(path):
+_SESSION: requests.Session | None = None
+
+
+def _get_session() -> requests.Session:
+    """Return a shared session so repeated lookups reuse the kept-alive TLS connection."""
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = f"conda-meta-mcp/{APP_VERSION}"
+        _SESSION = session
+    return _SESSION
+
+
+@peekable_lru_cache(maxsize=1024)
+def _file_path_search_raw(query):
     """
-    Fetch raw artifacts list for a given path from the conda-forge-paths API.
+    Fetch raw artifacts list for a given (already stripped) path from the conda-forge-paths API.
 
-    This function is cached by `path` only. It returns a dict with keys:
+    This function is cached by `query` only (in memory and on disk for successful
+    responses). It returns a dict with keys:
       - ok (bool): whether the external API call succeeded
       - artifacts (list[str]): list of artifact names when ok is True
       - error (str, optional): error message when ok is False
     """
-    if not path or not path.strip():
+    if not query:
         raise ValueError("path must be a non-empty string")
 
-    query = path.strip()
+    cached = _DISK_CACHE.get(query)
+    if cached is not None:
+        return cached
 
     try:
-        r = requests.get(
+        r = _get_session().get(
             "https://conda-db.openteams.ai/path_to_artifacts/find_artifacts.json",
             params={"path": query},
             timeout=10,
         )
         r.raise_for_status()
-        data = r.json()
+        data = from_json(r.content)
         if data.get("ok"):
-            artifacts = [row[0] for row in data.get("rows", [])]
-            return {"ok": True, "artifacts": artifacts}
+            # Rows are 1-element arrays; project them in C rather than a Python-level loop
+            artifacts = list(map(itemgetter(0), data.get("rows") or ()))
+            result = {"ok": True, "artifacts": artifacts}
+            _DISK_CACHE.set(query, result)
+            return result
         else:
             return {"ok": False, "artifacts": [], "error": data.get("error", "Unknown error")}
     except Exception as e:
@@ -59,21 +84,23 @@ def _file_path_search(path, channel: str, limit: int = 0, offset: int = 0):
             - offset: offset used in this query (int)
             - error: optional error string if available
     """
-    # Basic validation
-    if not path or not path.strip():
+    # Basic validation; the stripped path is also the cache key of the raw layer
+    query = path.strip() if isinstance(path, str) else ""
+    if not query:
         raise ValueError("path must be a non-empty string")
     require_conda_forge_channel(channel)
 
     try:
-        limit = int(limit or 0)
-        offset = int(offset or 0)
+        if not isinstance(limit, int):
+            limit = int(limit or 0)
+        if not isinstance(offset, int):
+            offset = int(offset or 0)
     except Exception:
         raise ValueError("limit and offset must be integers")
 
     if limit < 0 or offset < 0:
         raise ValueError("limit and offset must be non-negative integers")
 
-    query = path.strip()
     raw = _file_path_search_raw(query)
 
     if not raw.get("ok"):
@@ -83,22 +110,21 @@ def _file_path_search(path, channel: str, limit: int = 0, offset: int = 0):
             "artifacts": [],
             "count": 0,
             "total": 0,
-            "limit": limit if limit and limit > 0 else 0,
-            "offset": max(offset, 0),
+            "limit": limit,
+            "offset": offset,
             "error": raw.get("error", "Unknown error"),
         }
 
     artifacts = raw["artifacts"]
     total = len(artifacts)
-    offset = max(offset, 0)
-    paginated = artifacts[offset : offset + limit] if limit and limit > 0 else artifacts[offset:]
+    paginated = artifacts[offset : offset + limit] if limit else artifacts[offset:]
 
     return {
         "query_path": query,
         "artifacts": paginated,
         "count": len(paginated),
         "total": total,
-        "limit": limit if limit and limit > 0 else total,
+        "limit": limit or total,
         "offset": offset,
     }
 
@@ -130,7 +156,10 @@ async def file_path_search(path, channel: str, limit: int = 0, offset: int = 0):
     """
     try:
         channel = require_conda_forge_channel(channel)
-        return await asyncio.to_thread(_file_path_search, path, channel, limit, offset)
+        # Cached responses are answered on the event loop; only misses need a worker thread
+        if isinstance(path, str) and _file_path_search_raw.cache_peek(path.strip()) is not None:
+            return _file_path_search(path, channel, limit, offset)
+        return await run_blocking(_file_path_search, path, channel, limit, offset)
     except ToolError:
         raise
     except ValueError as ve:
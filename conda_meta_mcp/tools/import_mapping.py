@@ -7,14 +7,15 @@ This tool is based on (and wraps) logic from:
 
 from __future__ import annotations
 
-import asyncio
 from collections.abc import Callable
-from functools import lru_cache
 from typing import Any
 
 from fastmcp.exceptions import ToolError
 
 from ._channels import require_conda_forge_channel
+from ._executor import run_blocking_once
+from ._keys import parse_keys
+from .cache_utils import peekable_lru_cache
 from .registry import register_tool
 
 DISABLED_MESSAGE = "Disabled, enable via installing the package conda-forge-metadata"
@@ -39,59 +40,67 @@ else:
     map_import_to_package = _map_import_to_package
 
 
-@lru_cache(maxsize=1024)
-def _map_import(import_name: str, channel: str, get_keys: str = "") -> dict[str, Any]:
-    """Map import name to package.
+@peekable_lru_cache(maxsize=1024)
+def _map_import_full(query: str) -> dict[str, Any]:
+    """Map an (already stripped) import name to package, without field filtering.
 
+    Cached by query only so that calls differing just in get_keys share one entry.
     Returns dict with structure matching ImportMappingResult TypedDict.
     """
-    if not import_name or not import_name.strip():
-        raise ValueError("import_name must be a non-empty string")
-    require_conda_forge_channel(channel)
     if get_pkgs_for_import is None or map_import_to_package is None:
         raise ToolError(DISABLED_MESSAGE)
 
-    query = import_name.strip()
-
     # Underlying function truncates to top-level automatically.
     candidates, normalized = get_pkgs_for_import(query)
 
     if candidates is None or len(candidates) == 0:
         # No mapping known; identity fallback.
-        result = {
+        return {
             "query_import": query,
             "normalized_import": normalized,
             "best_package": normalized,
             "candidate_packages": [],
             "heuristic": "identity",
         }
+
+    best = map_import_to_package(query)
+
+    if best == normalized and best in candidates:
+        heuristic = "identity_present"
+    elif best in candidates:
+        heuristic = "ranked_selection"
     else:
-        best = map_import_to_package(query)
+        heuristic = "fallback"
 
-        if best == normalized and best in candidates:
-            heuristic = "identity_present"
-        elif best in candidates:
-            heuristic = "ranked_selection"
-        else:
-            heuristic = "fallback"
+    return {
+        "query_import": query,
+        "normalized_import": normalized,
+        "best_package": best,
+        "candidate_packages": sorted(candidates),
+        "heuristic": heuristic,
+    }
 
-        result = {
-            "query_import": query,
-            "normalized_import": normalized,
-            "best_package": best,
-            "candidate_packages": sorted(candidates),
-            "heuristic": heuristic,
-        }
+
+def _map_import(import_name: str, channel: str, get_keys: str = "") -> dict[str, Any]:
+    """Map import name to package.
+
+    Returns dict with structure matching ImportMappingResult TypedDict.
+    """
+    if not import_name or not import_name.strip():
+        raise ValueError("import_name must be a non-empty string")
+    require_conda_forge_channel(channel)
+
+    result = _map_import_full(import_name.strip())
 
     # Apply field filtering if get_keys is specified
-    if get_keys and get_keys.strip():
-        keys = set(k.strip() for k in get_keys.split(",") if k.strip())
+    keys = parse_keys(get_keys)
+    if keys:
         result = {k: v for k, v in result.items() if k in keys}
 
     return result
 
 
-@register_tool(cache_clearers=[_map_import.cache_clear])
+@register_tool(cache_clearers=[_map_import_full.cache_clear])
 async def import_mapping(import_name: str, channel: str, get_keys: str = "") -> dict[str, Any]:
     """
     Map a (possibly dotted) Python import name to the most likely conda package
@@ -128,7 +137,10 @@ async def import_mapping(import_name: str, channel: str, get_keys: str = "") ->
     """
     try:
         channel = require_conda_forge_channel(channel)
-        return await asyncio.to_thread(_map_import, import_name, channel, get_keys)
+        # Cached mappings are answered on the event loop; only misses need a worker thread
+        if import_name and _map_import_full.cache_peek(import_name.strip()) is not None:
+            return _map_import(import_name, channel, get_keys)
+        return await run_blocking_once(_map_import, import_name, channel, get_keys)
     except ToolError:
         raise
     except ValueError as ve:
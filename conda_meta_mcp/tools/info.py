@@ -1,24 +1,32 @@
 from __future__ import annotations
 
-import asyncio
 import sys
-from functools import cache
 from typing import Any
 
 from fastmcp import Context  # noqa: TC002
-from fastmcp.exceptions import ToolError
+from fastmcp.exceptions import ResourceError, ToolError
+from pydantic_core import to_json
 
-from .registry import register_tool
+from ._executor import run_blocking
+from .registry import register_resource, register_tool
+
+INFO_RESOURCE_URI = "conda-meta-mcp://info"
+
+_INFO: dict[str, Any] | None = None
+_INFO_JSON: str | None = None
 
 
-@cache
 def _get_info() -> dict[str, Any]:
-    """Get version information for all dependencies.
+    """Get version information for all dependencies (computed once per process).
 
     Returns:
         dict[str, Any]: Mapping of package names to version strings.
             See InfoResult TypedDict for structure.
     """
+    global _INFO
+    if _INFO is not None:
+        return _INFO
+
     from conda import __version__ as conda_version
     from conda_package_streaming import __version__ as conda_package_streaming_version
     from fastmcp import __version__ as fastmcp_version
@@ -31,7 +39,7 @@ def _get_info() -> dict[str, Any]:
     if "/.pixi/envs/" in sys.executable:
         pixi_env_path = sys.executable.rsplit("/", 2)[0]
 
-    return {
+    _INFO = {
         "conda_version": conda_version,
         "libmambapy_version": libmambapy_version,
         "fastmcp_version": fastmcp_version,
@@ -39,6 +47,7 @@ def _get_info() -> dict[str, Any]:
         "conda_meta_mcp_version": __version__,
         "pixi_env_path": pixi_env_path,
     }
+    return _INFO
 
 
 @register_tool
@@ -54,9 +63,26 @@ async def info(ctx: Context) -> dict[str, Any]:
             See InfoResult TypedDict for structure.
     """
     await ctx.info("Info got called")
+    # The version imports (libmambapy in particular) only run once; afterwards the
+    # result is a plain dict not worth a thread hop
+    if _INFO is not None:
+        return _INFO
     try:
-        return await asyncio.to_thread(_get_info)
+        return await run_blocking(_get_info)
     except ImportError as ie:
         raise ToolError(f"[import_error] Failed to load dependencies: {ie}") from ie
     except Exception as e:
         raise ToolError(f"[unknown_error] 'info' failed: {e}") from e
+
+
+@register_resource(INFO_RESOURCE_URI, name="info", mime_type="application/json")
+async def info_resource() -> str:
+    """Version information about the MCP instance, same content as the info tool (JSON)"""
+    global _INFO_JSON
+    if _INFO_JSON is None:
+        try:
+            info_dict = _INFO if _INFO is not None else await run_blocking(_get_info)
+        except ImportError as ie:
+            raise ResourceError(f"[import_error] Failed to load dependencies: {ie}") from ie
+        _INFO_JSON = to_json(info_dict).decode()
+    return _INFO_JSON
@@ -7,53 +7,284 @@ for CDN provided channels.
 
 from __future__ import annotations
 
-import asyncio
-import json
+import copy
+import re
+from collections import deque
+from contextlib import closing
 from functools import lru_cache
-from typing import Any
+from itertools import islice
+from typing import TYPE_CHECKING, Any
 
+import requests
 import yaml
 from conda_package_streaming.url import stream_conda_info
 from fastmcp.exceptions import ToolError
+from pydantic_core import from_json
+from requests.adapters import HTTPAdapter
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
 
+from .. import APP_VERSION
+from ._disk_cache import DiskCache
+from ._executor import MAX_WORKERS, run_blocking_once
+from ._keys import parse_keys
+from .cache_utils import ByteBudget, env_bytes, peekable_lru_cache
 from .registry import register_tool
 
-SOME_FILES = {"info/recipe/meta.yaml", "info/about.json", "info/run_exports.json"}
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Set
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+_YAML_STR_TAG = "tag:yaml.org,2002:str"
+
+SOME_FILES = frozenset({"info/recipe/meta.yaml", "info/about.json", "info/run_exports.json"})
+
+# The info/ contents at a package URL never change once published
+_INFO_DISK_CACHE = DiskCache("package_insights", ttl=30 * 24 * 60 * 60)
+
+# Upper bound (in characters) for the member maps kept in memory, shared by all readers;
+# single recipes can be several MB, so an entry count alone does not bound memory use.
+READ_ALL_CACHE_BYTES_ENV = "CONDA_META_MCP_INSIGHTS_CACHE_BYTES"
+_READ_ALL_CACHE_BYTES = env_bytes(READ_ALL_CACHE_BYTES_ENV, default=64 * 1024 * 1024)
+_CACHE_BUDGET = ByteBudget(_READ_ALL_CACHE_BYTES)
+
+_SESSION: requests.Session | None = None
+
+
+def _get_session() -> requests.Session:
+    """Return a shared session whose per-host pool fits every tool worker.
+
+    The default pool keeps 10 connections per host, so concurrent calls against the
+    same CDN beyond that would reconnect and discard connections instead of reusing them.
+    """
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = f"conda-meta-mcp/{APP_VERSION}"
+        adapter = HTTPAdapter(pool_maxsize=MAX_WORKERS)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _SESSION = session
+    return _SESSION
+
+
+def _lines_size(lines: tuple[str, ...]) -> int:
+    # the split lines plus the content string they are keyed on
+    return 2 * sum(map(len, lines))
+
+
+@peekable_lru_cache(maxsize=256, sizeof=_lines_size, budget=_CACHE_BUDGET)
+def _lines(content: str) -> tuple[str, ...]:
+    """Split a (cached) file once, so paging through it only slices."""
+    return tuple(content.splitlines())
+
+
+# The boundaries str.splitlines() splits on, with "\r\n" counting once
+_LINE_BREAKS = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 def _line_count(s: str) -> int:
-    return len(s.splitlines()) if s else 0
+    """Count the lines _lines would split s into, without splitting it."""
+    if not s:
+        return 0
+    lines = _lines.cache_peek(s)
+    if lines is not None:
+        return len(lines)
+    return len(_LINE_BREAKS.findall(s)) + (_LINE_BREAKS.match(s[-1]) is None)
 
 
-@lru_cache(maxsize=128)
+def _read_member(tar: Any, member: Any) -> tuple[str, bool]:
+    """Return (content, ok) for one tar member; failures are reported inline."""
+    try:
+        return tar.extractfile(member).read().decode(), True
+    except Exception as e:
+        return f"error while extracting: {e}", False
+
+
+def _member_map_size(data: dict[str, str]) -> int:
+    return sum(len(name) + len(content) for name, content in data.items())
+
+
+@peekable_lru_cache(maxsize=128, sizeof=_member_map_size, budget=_CACHE_BUDGET)
 def _read_all(url: str) -> dict[str, str]:
+    cached = _INFO_DISK_CACHE.get(url)
+    if cached is not None:
+        return cached
     data = {}
-    for tar, member in stream_conda_info(url):
-        try:
-            data[member.name] = tar.extractfile(member).read().decode()
-        except Exception as e:
-            data[member.name] = f"error while extracting: {e}"
+    complete = True
+    for tar, member in stream_conda_info(url, session=_get_session()):
+        data[member.name], ok = _read_member(tar, member)
+        complete &= ok
+    if complete:
+        _INFO_DISK_CACHE.set(url, data)
     return data
 
 
+@peekable_lru_cache(maxsize=128, sizeof=_member_map_size, budget=_CACHE_BUDGET)
+def _read_some(url: str) -> dict[str, str]:
+    """Read only the SOME_FILES members, closing the stream once all have been seen."""
+    full = _read_all.cache_peek(url)
+    if full is not None:
+        return {k: v for k, v in full.items() if k in SOME_FILES}
+    key = f"{url}#some"
+    cached = _INFO_DISK_CACHE.get(key)
+    if cached is not None:
+        return cached
+    data = {}
+    complete = True
+    with closing(stream_conda_info(url, session=_get_session())) as stream:
+        for tar, member in stream:
+            if member.name not in SOME_FILES:
+                continue
+            data[member.name], ok = _read_member(tar, member)
+            complete &= ok
+            if len(data) == len(SOME_FILES):
+                break
+    if complete:
+        _INFO_DISK_CACHE.set(key, data)
+    return data
+
+
+@peekable_lru_cache(maxsize=128, sizeof=_member_map_size, budget=_CACHE_BUDGET)
+def _read_one(url: str, name: str) -> dict[str, str]:
+    """Read a single member, closing the stream as soon as it has been seen.
+
+    A name the archive does not contain yields an (equally cached) empty map, so
+    repeating the request does not download the package again.
+    """
+    full = _read_all.cache_peek(url)
+    if full is None:
+        full = _INFO_DISK_CACHE.get(url)
+    if full is not None:
+        return {name: full[name]} if name in full else {}
+    key = f"{url}#{name}"
+    cached = _INFO_DISK_CACHE.get(key)
+    if cached is not None:
+        return cached
+    data = {}
+    ok = True
+    with closing(stream_conda_info(url, session=_get_session())) as stream:
+        for tar, member in stream:
+            if member.name == name:
+                data[name], ok = _read_member(tar, member)
+                break
+    if ok:
+        _INFO_DISK_CACHE.set(key, data)
+    return data
+
+
+# file= values selecting a group of members; anything else names a single member
+_FILE_SELECTIONS: dict[str, Callable[[str], dict[str, str]]] = {
+    "all": _read_all,
+    "some": _read_some,
+}
+
+
 def _parse_file_content(content: str, filepath: str) -> Any:
     """Parse file content based on file type (YAML/JSON)."""
     if filepath.endswith(".json"):
-        return json.loads(content)
+        return from_json(content)
     elif filepath.endswith(".yaml") or filepath.endswith(".yml"):
-        return yaml.safe_load(content)
+        return yaml.load(content, Loader=_YamlLoader)
     else:
         # For non-structured files, return as-is
         return content
 
 
+class _EventLoader(Composer, SafeConstructor, Resolver):
+    """Compose and construct YAML from an already parsed event list."""
+
+    def __init__(self, events: list[yaml.Event]) -> None:
+        self._events = deque(events)
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+    def check_event(self, *choices: type[yaml.Event]) -> bool:
+        return bool(self._events) and (not choices or isinstance(self._events[0], choices))
+
+    def peek_event(self) -> yaml.Event:
+        return self._events[0]
+
+    def get_event(self) -> yaml.Event:
+        return self._events.popleft()
+
+
+def _node_events(
+    first: yaml.Event, events: Iterator[yaml.Event], keep: bool
+) -> list[yaml.Event] | None:
+    """Consume the node starting with ``first``, returning its events if ``keep``.
+
+    Returns None for a kept node containing an alias, which may refer to a skipped anchor.
+    """
+    collected = [first]
+    depth = 0
+    event = first
+    while True:
+        if isinstance(event, yaml.CollectionStartEvent):
+            depth += 1
+        elif isinstance(event, yaml.CollectionEndEvent):
+            depth -= 1
+        elif keep and isinstance(event, yaml.AliasEvent):
+            return None
+        if depth == 0:
+            return collected
+        event = next(events)
+        if keep:
+            collected.append(event)
+
+
+def _load_yaml_subset(content: str, keys: Set[str]) -> Any:
+    """Load a YAML document, constructing only the requested top-level mapping keys.
+
+    Values under other keys are only tokenized by the (C) parser and never constructed.
+    Documents that are not a plain top-level mapping, that have a top-level key which is
+    not a string (including ``<<`` merge keys), or whose kept values use aliases, are
+    loaded in full instead.
+    """
+    events = iter(yaml.parse(content, Loader=_YamlLoader))
+    head = list(islice(events, 3))
+    if (
+        len(head) < 3
+        or not isinstance(head[2], yaml.MappingStartEvent)
+        or head[2].anchor is not None
+    ):
+        return yaml.load(content, Loader=_YamlLoader)
+
+    kept: list[yaml.Event] = []
+    resolver = Resolver()
+    while not isinstance(event := next(events), yaml.MappingEndEvent):
+        if not isinstance(event, yaml.ScalarEvent) or event.anchor is not None:
+            return yaml.load(content, Loader=_YamlLoader)
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+        if tag != _YAML_STR_TAG:
+            return yaml.load(content, Loader=_YamlLoader)
+        keep = event.value in keys
+        value_events = _node_events(next(events), events, keep)
+        if value_events is None:
+            return yaml.load(content, Loader=_YamlLoader)
+        if keep:
+            kept += [event, *value_events]
+
+    tail = list(events)
+    if [type(e) for e in tail] != [yaml.DocumentEndEvent, yaml.StreamEndEvent]:
+        return yaml.load(content, Loader=_YamlLoader)
+    return _EventLoader([*head, *kept, yaml.MappingEndEvent(), *tail]).get_single_data()
+
+
 def _extract_keys_from_dict(data: Any, keys_str: str) -> Any:
     """Extract specified keys from parsed data (dict or list)."""
-    if not keys_str or not keys_str.strip():
+    keys = parse_keys(keys_str)
+    if not keys:
         return data
 
-    keys = set(k.strip() for k in keys_str.split(",") if k.strip())
-
     if isinstance(data, dict):
         return {k: v for k, v in data.items() if k in keys}
     elif isinstance(data, list):
@@ -67,59 +298,91 @@ def _extract_keys_from_dict(data: Any, keys_str: str) -> Any:
         return data
 
 
-def _package_insights(
-    url: str,
-    file: str = "some",
-    limit: int = 0,
-    offset: int = 0,
-    get_keys: str = "",
-) -> dict[str, Any]:
-    data = _read_all(url)
-    # list-without-content is a listing mode; paging not applied per requirement
-    if file == "list-without-content":
-        return {k: str(_line_count(v)) for k, v in data.items() if k in SOME_FILES}
-    if file == "all":
-        selected = data
-    elif file == "some":
-        selected = {k: v for k, v in data.items() if k in SOME_FILES}
+def _extract_keys_from_file(content: str, filepath: str, keys_str: str) -> Any:
+    """Parse one file and extract keys, reporting failures as parsing errors."""
+    try:
+        keys = parse_keys(keys_str)
+        if keys and filepath.endswith((".yaml", ".yml")):
+            parsed = _load_yaml_subset(content, keys)
+        else:
+            parsed = _parse_file_content(content, filepath)
+        return _extract_keys_from_dict(parsed, keys_str)
+    except ValueError as e:
+        # from_json reports malformed JSON as ValueError
+        if filepath.endswith(".json"):
+            raise ToolError(f"[parsing_error] Failed to parse {filepath} as JSON: {e}") from e
+        raise ToolError(f"[parsing_error] Failed to extract keys from {filepath}: {e}") from e
+    except Exception as e:
+        raise ToolError(f"[parsing_error] Failed to extract keys from {filepath}: {e}") from e
+
+
+def _select(url: str, file: str, limit: int, offset: int) -> dict[str, str]:
+    reader = _FILE_SELECTIONS.get(file)
+    if reader is not None:
+        selected = reader(url)
     else:
-        selected = {file: data[file]}
+        selected = _read_one(url, file)
+        if not selected:
+            raise KeyError(file)
 
     # Apply line-level paging (not file-level): slice lines inside each selected file
     if (limit and limit > 0) or (offset and offset > 0):
         offset = max(offset, 0)
         processed: dict[str, str] = {}
         for k, v in selected.items():
-            lines = v.splitlines()
+            lines = _lines(v)
             sliced = lines[offset : offset + limit] if limit and limit > 0 else lines[offset:]
             processed[k] = "\n".join(sliced)
         selected = processed
+    return selected
 
-    # Apply get_keys filtering: parse file and extract specific keys
-    if get_keys and get_keys.strip():
-        # Only one file can be selected when using get_keys for key extraction
-        if len(selected) != 1:
-            raise ToolError(
-                "get_keys parameter requires exactly one file to be selected. "
-                f"Got {len(selected)} files. Use file parameter to select a single file."
-            )
 
-        filepath = next(iter(selected.keys()))
-        content = selected[filepath]
+@lru_cache(maxsize=128)
+def _extracted_keys(url: str, file: str, limit: int, offset: int, get_keys: str) -> dict[str, Any]:
+    """Parse the selected file and extract get_keys from it.
 
-        try:
-            parsed = _parse_file_content(content, filepath)
-            extracted = _extract_keys_from_dict(parsed, get_keys)
-            return {filepath: extracted}
-        except json.JSONDecodeError as e:
-            raise ToolError(f"[parsing_error] Failed to parse {filepath} as JSON: {e}") from e
-        except Exception as e:
-            raise ToolError(f"[parsing_error] Failed to extract keys from {filepath}: {e}") from e
+    Memoized on the request rather than on the file content, since repeated get_keys
+    calls would otherwise re-parse it; _package_insights hands out copies only.
+    """
+    selected = _select(url, file, limit, offset)
+    # Only one file can be selected when using get_keys for key extraction
+    if len(selected) != 1:
+        raise ToolError(
+            "get_keys parameter requires exactly one file to be selected. "
+            f"Got {len(selected)} files. Use file parameter to select a single file."
+        )
 
-    return selected
+    filepath, content = next(iter(selected.items()))
+    return {filepath: _extract_keys_from_file(content, filepath, get_keys)}
+
+
+def _package_insights(
+    url: str,
+    file: str = "some",
+    limit: int = 0,
+    offset: int = 0,
+    get_keys: str = "",
+) -> dict[str, Any]:
+    # list-without-content is a listing mode; paging not applied per requirement
+    if file == "list-without-content":
+        return {k: str(_line_count(v)) for k, v in _read_some(url).items()}
+
+    # Apply get_keys filtering: parse file and extract specific keys
+    if get_keys and get_keys.strip():
+        return copy.deepcopy(_extracted_keys(url, file, limit, offset, get_keys))
+
+    return _select(url, file, limit, offset)
 
 
-@register_tool(cache_clearers=[_read_all.cache_clear])
+@register_tool(
+    cache_clearers=[
+        _read_all.cache_clear,
+        _read_some.cache_clear,
+        _read_one.cache_clear,
+        _lines.cache_clear,
+        _extracted_keys.cache_clear,
+    ]
+)
 async def package_insights(
     url: str, file: str = "some", limit: int = 0, offset: int = 0, get_keys: str = ""
 ) -> dict[str, Any]:
@@ -152,7 +415,7 @@ async def package_insights(
          A dictionary with key=filename, value=content or parsed object.
     """
     try:
-        return await asyncio.to_thread(_package_insights, url, file, limit, offset, get_keys)
+        return await run_blocking_once(_package_insights, url, file, limit, offset, get_keys)
     except ValueError as ve:
         raise ToolError(f"[validation_error] Invalid input: {ve}") from ve
     except KeyError as ke:
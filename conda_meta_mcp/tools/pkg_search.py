@@ -1,70 +1,192 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import bisect
 import contextlib
+import heapq
+import json
+import sys
+import threading
 from functools import lru_cache
-from typing import Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from conda.api import SubdirData
 from conda.models.version import VersionOrder
 from fastmcp.exceptions import ToolError
-from pydantic import BaseModel, ConfigDict
 
+from ._disk_cache import DiskCache
+from ._executor import run_blocking, run_blocking_once
+from ._keys import parse_keys
 from .registry import register_tool
 
+if TYPE_CHECKING:
+    from conda.core.subdir_data import SubdirData
 
-class PackageRecord(BaseModel):
+# (channel, platform) -> subdir URLs to query (multi-channels expanded, plus noarch)
+_SUBDIR_URLS: dict[tuple[str, str], tuple[str, ...]] = {}
+# (channel, platform) -> lock held while those subdirs are loaded or queried
+_SUBDIR_LOCKS: dict[tuple[str, str], threading.Lock] = {}
+
+# Channels publish new builds continuously; keep persisted results about as fresh as
+# the periodic in-memory cache cleanup.
+_SEARCH_DISK_CACHE = DiskCache("package_search", ttl=30 * 60)
+
+
+class PackageRecord(NamedTuple):
     version: str
     build_number: str
     build: str
     url: str
     depends: str
 
-    model_config = ConfigDict(frozen=True)
 
-    def __hash__(self):
-        return hash((self.version, self.build_number, self.build, self.url, self.depends))
+def _interned_record(
+    version: str, build_number: str, build: str, url: str, depends: str
+) -> PackageRecord:
+    """Build a record sharing the strings that repeat across builds.
+
+    Versions and depends repeat across builds of one version; build strings such as
+    "pyhd8ed1ab_0" repeat across versions. Only the url is unique per record.
+    """
+    return PackageRecord(
+        version=sys.intern(version),
+        build_number=sys.intern(build_number),
+        build=sys.intern(build),
+        url=url,
+        depends=sys.intern(depends),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _version_order(version: str) -> VersionOrder:
+    """Parse a version once; builds of the same version share the result."""
+    return VersionOrder(version)
+
+
+def _sort_key(record: PackageRecord) -> tuple[VersionOrder, int]:
+    """Newest-first ordering key: version, then numeric build number."""
+    build_number = int(record.build_number) if record.build_number.isdigit() else -1
+    return (_version_order(record.version), build_number)
+
+
+def _get_subdirs(channel: str, platform: str) -> tuple[SubdirData, ...]:
+    """Return the SubdirData behind channel/platform.
 
-    def _build_number_int(self):
-        return int(self.build_number) if self.build_number.isdigit() else -1
+    Multi-channels such as "defaults" expand to several subdirs, as in SubdirData.query_all
+    (which would re-resolve the channel URLs and start a thread pool on every query). The
+    URLs are resolved, and checked against allowlist_channels/denylist_channels, once per
+    pair; the instances still come from SubdirData's own cache on every call, so a
+    file:// channel changed on disk is re-read.
+    """
+    # Imported on first search to keep server startup (tool registration) light
+    from conda.core.subdir_data import SubdirData
+    from conda.models.channel import Channel
+
+    urls = _SUBDIR_URLS.get((channel, platform))
+    if urls is None:
+        from conda.base.context import context, validate_channels
+        from conda.gateways.repodata import create_cache_dir
+        from conda.models.channel import all_channel_urls
+
+        create_cache_dir()
+        urls = all_channel_urls([f"{channel}/{platform}"], subdirs=[platform])
+        if context.offline:
+            urls = [url for url in urls if url.startswith("file://")]
+        urls = validate_channels(urls)
+        _SUBDIR_URLS[(channel, platform)] = urls
+    return tuple(SubdirData(Channel(url)) for url in urls)
 
-    def _ordering_tuple(self):
-        return (VersionOrder(self.version), self._build_number_int())
 
-    def __lt__(self, other):
-        return self._ordering_tuple() < other._ordering_tuple()
+def _needed_bucket(needed: int) -> int:
+    """Round up to a power of two so nearby page ends share one cache entry."""
+    return 1 << (needed - 1).bit_length()
 
 
 @lru_cache(maxsize=32)
-def _full_package_search(package_ref_or_match_spec, channel, platform) -> list[PackageRecord]:
-    return list(
-        sorted(
-            {
-                PackageRecord(
-                    version=str(match.version),
-                    build_number=str(match.build_number),
-                    build=str(match.build),
-                    url=str(match.url),
-                    depends=str(match.depends),
-                )
-                for match in SubdirData.query_all(
-                    package_ref_or_match_spec,
-                    channels=[f"{channel}/{platform}"],
-                    subdirs=[platform],
-                )
-            },
-            reverse=True,
-        )
-    )
+def _unique_records(package_ref_or_match_spec, channel, platform) -> tuple[PackageRecord, ...]:
+    """Query the subdirs once per spec; pages of any size are selected from these records.
+
+    Records are deduplicated by url, which identifies an artifact, before a record is
+    built. Concurrent searches on one channel/platform wait for each other, so a cold
+    repodata load happens once instead of once per request.
+    """
+    records: dict[str, PackageRecord] = {}
+    with _SUBDIR_LOCKS.setdefault((channel, platform), threading.Lock()):
+        for subdir in _get_subdirs(channel, platform):
+            for match in subdir.query(package_ref_or_match_spec):
+                url = str(match.url)
+                if url not in records:
+                    records[url] = _interned_record(
+                        version=str(match.version),
+                        build_number=str(match.build_number),
+                        build=str(match.build),
+                        url=url,
+                        depends=str(match.depends),
+                    )
+    return tuple(records.values())
+
+
+@lru_cache(maxsize=32)
+def _full_package_search(
+    package_ref_or_match_spec, channel, platform, needed: int | None = None
+) -> tuple[list[PackageRecord], int]:
+    """Return the newest ``needed`` unique records (all if None) and the total match count.
+
+    Selecting only the first records of a broad spec (e.g. limit=1) avoids sorting every
+    match; only complete results are persisted to the disk cache.
+    """
+    key = json.dumps([str(package_ref_or_match_spec), channel, platform])
+    cached = _SEARCH_DISK_CACHE.get(key)
+    if cached is not None:
+        records = [_interned_record(**record) for record in cached]
+        return records[:needed], len(records)
+
+    unique = _unique_records(package_ref_or_match_spec, channel, platform)
+    if needed is not None and needed < len(unique):
+        return heapq.nlargest(needed, unique, key=_sort_key), len(unique)
+
+    results = sorted(unique, key=_sort_key, reverse=True)
+    _SEARCH_DISK_CACHE.set(key, [record._asdict() for record in results])
+    return results, len(results)
+
+
+def _encode_cursor(record: PackageRecord) -> str:
+    """Opaque cursor pointing just past ``record`` in the newest-first ordering."""
+    payload = json.dumps([record.version, record.build_number, record.url])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _cursor_start(results: list[PackageRecord], cursor: str) -> int:
+    """Return the index of the first record after the one the cursor points to.
+
+    The position is found by bisecting on the sort key, so it does not depend on how deep
+    the page is. If that record is gone (the cache was refreshed), paging resumes at the
+    first record ordered after it.
+    """
+    try:
+        version, build_number, url = json.loads(base64.urlsafe_b64decode(cursor))
+        target = _sort_key(PackageRecord(version, build_number, "", url, ""))
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"invalid cursor {cursor!r}") from e
+
+    # Keys descend along results, so "not newer than the cursor" flips False -> True once
+    start = bisect.bisect_left(results, True, key=lambda r: _sort_key(r) <= target)
+    end = start
+    while end < len(results) and _sort_key(results[end]) == target:
+        if results[end].url == url:
+            return end + 1
+        end += 1
+    return end
 
 
 def _clear_conda_subdirdata_cache_for_pkg_search() -> None:
     """
     Clear Conda's SubdirData global caches used by package_search.
 
-    This cleans up large repodata JSON caches held in memory by Conda,
-    in addition to our own lru_cache for _full_package_search.
+    This cleans up large repodata JSON caches held in memory by Conda and the resolved
+    subdir URLs; our own lru_caches are cleared by their own registered clearers.
     """
+    _SUBDIR_URLS.clear()
     with contextlib.suppress(Exception):
         from conda.core.subdir_data import SubdirData
 
@@ -88,16 +210,24 @@ def _filter_keys(results: list[PackageRecord], get_keys: str) -> list[dict]:
     Returns:
         List of dictionaries with only requested keys, or original records if get_keys is empty
     """
-    if not get_keys or not get_keys.strip():
+    keys = parse_keys(get_keys)
+    if not keys:
         # Return as dict to maintain serialization
-        return [r.model_dump() for r in results]
+        return [r._asdict() for r in results]
 
-    keys = set(k.strip() for k in get_keys.split(",") if k.strip())
-    return [{k: v for k, v in r.model_dump().items() if k in keys} for r in results]
+    # Resolve the requested fields once (in record order) instead of per record
+    selected = [(i, field) for i, field in enumerate(PackageRecord._fields) if field in keys]
+    return [{field: r[i] for i, field in selected} for r in results]
 
 
 def _package_search(
-    package_ref_or_match_spec, channel, platform, limit, offset, get_keys: str = ""
+    package_ref_or_match_spec,
+    channel,
+    platform,
+    limit,
+    offset,
+    get_keys: str = "",
+    cursor: str = "",
 ) -> dict[str, Any]:
     """Search for packages and return results with pagination metadata.
 
@@ -106,25 +236,65 @@ def _package_search(
         'results': list of package records (filtered by get_keys if specified),
         'total': total number of matching packages,
         'limit': limit used in this query,
-        'offset': offset used in this query
+        'offset': offset used in this query,
+        'next_cursor': cursor for the following page (only when more records remain)
     }
     """
-    results = _full_package_search(package_ref_or_match_spec, channel, platform)
-    offset = max(offset or 0, 0)
+    if cursor:
+        # The start depends on the records themselves, so work on the full sorted list
+        results, total = _full_package_search(package_ref_or_match_spec, channel, platform)
+    else:
+        needed = _needed_bucket(max(offset or 0, 0) + limit) if limit and limit > 0 else None
+        results, total = _full_package_search(package_ref_or_match_spec, channel, platform, needed)
+    return _page(results, total, limit, offset, get_keys, cursor)
+
+
+def _merged_package_search(
+    searches: list[tuple[list[PackageRecord], int]], limit, offset, get_keys, cursor
+) -> dict[str, Any]:
+    """Page through the union of complete per-(channel, platform) search results.
+
+    Records are deduplicated by url across searches; noarch records appear once per platform.
+    """
+    unique = {record.url: record for results, _ in searches for record in results}
+    results = sorted(unique.values(), key=_sort_key, reverse=True)
+    return _page(results, len(results), limit, offset, get_keys, cursor)
+
+
+def _page(
+    results: list[PackageRecord], total: int, limit, offset, get_keys: str, cursor: str
+) -> dict[str, Any]:
+    """Select the requested page of newest-first results and build the response."""
+    offset = _cursor_start(results, cursor) if cursor else max(offset or 0, 0)
     paginated = results[offset : offset + limit] if limit and limit > 0 else results[offset:]
 
     # Apply field filtering if get_keys is specified
     filtered = _filter_keys(paginated, get_keys)
 
-    return {
+    payload = {
         "results": filtered,
-        "total": len(results),
-        "limit": limit if limit and limit > 0 else len(results),
+        "total": total,
+        "limit": limit if limit and limit > 0 else total,
         "offset": offset,
     }
+    if paginated and offset + len(paginated) < total:
+        payload["next_cursor"] = _encode_cursor(paginated[-1])
+    return payload
 
 
-@register_tool(cache_clearers=[_clear_conda_subdirdata_cache_for_pkg_search])
+def _split_csv(value: str) -> list[str]:
+    """Split a comma-separated argument into its unique, non-empty items."""
+    return list(dict.fromkeys(item.strip() for item in value.split(",") if item.strip()))
+
+
+@register_tool(
+    cache_clearers=[
+        _clear_conda_subdirdata_cache_for_pkg_search,
+        _unique_records.cache_clear,
+        _full_package_search.cache_clear,
+        _version_order.cache_clear,
+    ]
+)
 async def package_search(
     package_ref_or_match_spec: str,
     channel: str,
@@ -132,6 +302,7 @@ async def package_search(
     limit: int = 0,
     offset: int = 0,
     get_keys: str = "",
+    cursor: str = "",
 ) -> dict[str, Any]:
     """
     Search available conda packages matching the given package_ref_or_match_spec, channel, and
@@ -141,7 +312,8 @@ async def package_search(
       - Results are deduplicated.
       - Ordered by newest (version, then build_number descending).
       - limit=1 reliably returns the single newest record.
-      - Supports paging via (offset, limit).
+      - Supports paging via (offset, limit), or via (cursor, limit) which stays stable
+        when new builds are added.
       - Optional field filtering via get_keys parameter.
 
     Args:
@@ -149,11 +321,15 @@ async def package_search(
         e.g. "numpy", "numpy>=1.20", "numpy=1.20.3", "numpy=1.20.3=py38h550f1ac_0"
       channel (str): e.g. "defaults", "conda-forge", "bioconda", "nvidia"
       platform (str): e.g. "linux-64", "linux-aarch64", "osx-64", "osx-arm64", "win-64"
+        Several comma-separated channels and/or platforms (e.g. "conda-forge,bioconda")
+        are searched concurrently and merged into one result list.
       limit (int): Maximum number of results to return (0 means all).
       offset (int): Number of results to skip before applying limit (for paging).
       get_keys (str): Comma-separated field names to include in results.
                      Empty string returns all fields (default).
                      Example: "version,build,url" reduces context by ~60-70%.
+      cursor (str): next_cursor of a previous page; continues right after its last record
+                   (offset is ignored when given).
 
     Returns:
       dict with keys:
@@ -161,16 +337,32 @@ async def package_search(
         - total: total number of matching packages
         - limit: limit used in this query
         - offset: offset used in this query
+        - next_cursor: pass as cursor to get the next page (omitted on the last page)
     """
+    pairs = [(c, p) for c in _split_csv(channel) for p in _split_csv(platform)]
     try:
-        return await asyncio.to_thread(
+        if not pairs:
+            raise ValueError("channel and platform must each name at least one value")
+        if len(pairs) > 1:
+            searches = await asyncio.gather(
+                *(
+                    run_blocking_once(_full_package_search, package_ref_or_match_spec, c, p)
+                    for c, p in pairs
+                )
+            )
+            return await run_blocking(
+                _merged_package_search, searches, limit, offset, get_keys, cursor
+            )
+        ((c, p),) = pairs
+        return await run_blocking_once(
             _package_search,
             package_ref_or_match_spec,
-            channel,
-            platform,
+            c,
+            p,
             limit,
             offset,
             get_keys,
+            cursor,
         )
     except ValueError as ve:
         raise ToolError(f"[validation_error] Invalid input: {ve}") from ve
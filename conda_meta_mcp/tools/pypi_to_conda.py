@@ -7,14 +7,14 @@ This tool is based on (and wraps) logic from:
 
 from __future__ import annotations
 
-import asyncio
 from collections.abc import Callable
-from functools import lru_cache
 from typing import Any
 
 from fastmcp.exceptions import ToolError
 
 from ._channels import require_conda_forge_channel
+from ._executor import run_blocking_once
+from .cache_utils import peekable_lru_cache
 from .registry import register_tool
 
 DISABLED_MESSAGE = "Disabled, enable via installing the package conda-forge-metadata"
@@ -32,19 +32,20 @@ else:
     map_pypi_to_conda = _map_pypi_to_conda
 
 
-@lru_cache(maxsize=4096)
+@peekable_lru_cache(maxsize=4096)
 def _map_pypi_name(pypi_name: str, channel: str) -> dict[str, Any]:
-    """Map PyPI name to conda name.
+    """Map an (already stripped) PyPI name to conda name.
 
-    Returns dict with structure matching PyPiToCondaResult TypedDict.
+    Callers strip the name so that inputs differing only in surrounding whitespace share
+    one cache entry. Returns dict with structure matching PyPiToCondaResult TypedDict.
     """
-    if not pypi_name or not pypi_name.strip():
+    if not pypi_name:
         raise ValueError("pypi_name must be a non-empty string")
     require_conda_forge_channel(channel)
     if map_pypi_to_conda is None:
         raise ToolError(DISABLED_MESSAGE)
 
-    original = pypi_name.strip()
+    original = pypi_name
     conda_name = map_pypi_to_conda(original)
     changed = conda_name != original.lower()
     return {
@@ -73,7 +74,12 @@ async def pypi_to_conda(pypi_name: str, channel: str) -> dict[str, Any]:
     """
     try:
         channel = require_conda_forge_channel(channel)
-        return await asyncio.to_thread(_map_pypi_name, pypi_name, channel)
+        pypi_name = (pypi_name or "").strip()
+        # Cached mappings are answered on the event loop; only misses need a worker thread
+        cached = _map_pypi_name.cache_peek(pypi_name, channel)
+        if cached is not None:
+            return cached
+        return await run_blocking_once(_map_pypi_name, pypi_name, channel)
     except ToolError:
         raise
     except ValueError as ve:
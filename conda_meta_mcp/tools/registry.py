@@ -6,6 +6,7 @@ if TYPE_CHECKING:
     from collections.abc import Callable
 
 AVAILABLE_TOOLS: list[Callable[..., Any]] = []
+AVAILABLE_RESOURCES: list[Callable[..., Any]] = []
 
 
 def register_tool(
@@ -60,3 +61,28 @@ def register_tool(
 
     # Called without arguments: @register_tool
     return _decorate(fn)
+
+
+def register_resource(
+    uri: str, *, name: str | None = None, mime_type: str | None = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Register a decorated function as a static MCP resource served at ``uri``.
+
+    Usage:
+        @register_resource("conda-meta-mcp://my-resource", mime_type="application/json")
+        def my_resource() -> str:
+            ...
+
+    The decorator adds the function to AVAILABLE_RESOURCES and sets the
+    __mcp_resource_uri__, __mcp_resource_name__ and __mcp_resource_mime_type__ attributes.
+    """
+
+    def _decorate(f: Callable[..., Any]) -> Callable[..., Any]:
+        setattr(f, "__mcp_resource_uri__", uri)
+        setattr(f, "__mcp_resource_name__", name or f.__name__)
+        setattr(f, "__mcp_resource_mime_type__", mime_type)
+        AVAILABLE_RESOURCES.append(f)
+        return f
+
+    return _decorate
@@ -7,56 +7,112 @@ This tool is based on:
 
 from __future__ import annotations
 
-import asyncio
+import threading
 from functools import lru_cache
 from typing import Any, cast
 
-from conda.base.context import context
-from conda.models.channel import Channel
-from conda_libmamba_solver.index import LibMambaIndexHelper
 from fastmcp.exceptions import ToolError
 
+from ._executor import run_blocking_once
+from ._keys import parse_keys
+from .cache_utils import env_bytes, peekable_lru_cache
 from .registry import register_tool
 
-ALLOWED_SUBCMDS = {"depends", "whoneeds"}
+ALLOWED_SUBCMDS = frozenset({"depends", "whoneeds"})
+RESPONSE_FORMATS = frozenset({"rows", "columnar"})
+MAX_UNPAGINATED_PKGS = 1000
 
+# Upper bound (in estimated JSON characters) for the raw payloads kept in memory; a broad
+# whoneeds result can be tens of MB, so an entry count alone does not bound memory use.
+# Entries are also dropped by the periodic cache cleanup, which keeps them from going
+# stale. A single payload estimated above the whole budget is not cached at all, so
+# paging through it re-runs the query for every page; raise the limit for such queries.
+RAW_QUERY_CACHE_BYTES_ENV = "CONDA_META_MCP_REPOQUERY_CACHE_BYTES"
+_RAW_QUERY_CACHE_BYTES = env_bytes(RAW_QUERY_CACHE_BYTES_ENV, default=256 * 1024 * 1024)
 
-def _filter_package_keys(pkg: dict[str, Any], get_keys: str) -> dict[str, Any]:
+# (channel, platform) -> lock held while that index is loaded or queried
+_INDEX_LOCKS: dict[tuple[str, str], threading.Lock] = {}
+
+
+def _filter_package_keys(pkg: dict[str, Any], keys: frozenset[str]) -> dict[str, Any]:
     """Filter a package record to specified keys only.
 
     Args:
         pkg: Package record dictionary
-        get_keys: Comma-separated field names to include (empty = all fields)
+        keys: Field names to include, as parsed once per request by parse_keys (empty = all)
 
     Returns:
         Filtered package dictionary
     """
-    if not get_keys or not get_keys.strip():
+    if not keys:
         return pkg
 
-    keys = set(k.strip() for k in get_keys.split(",") if k.strip())
     return {k: v for k, v in pkg.items() if k in keys}
 
 
-@lru_cache(maxsize=64)
-def _cached_raw_query(subcmd: str, spec: str, channel: str, platform: str, tree: bool) -> dict:
+def _columns(pkgs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Lay out package records as one schema plus a row of values per package.
+
+    Field names are listed once instead of once per package; fields missing from a
+    package are None in its row.
     """
-    Execute the underlying query once and cache the full (unpaginated) raw payload.
+    schema = list(dict.fromkeys(key for pkg in pkgs for key in pkg))
+    return {"schema": schema, "data": [[pkg.get(key) for key in schema] for pkg in pkgs]}
 
-    For 'depends' / 'whoneeds' we return the raw QueryResult.to_dict() structure.
+
+@lru_cache(maxsize=4)
+def _get_index(channel: str, platform: str) -> Any:
+    """
+    Load the index for channel and platform (plus noarch) once.
+
+    Loading the repodata is the expensive part of a query; the loaded index is shared by
+    depends/whoneeds and tree/flat queries on the same channel. Only a few are kept since
+    each holds a channel's full repodata.
     """
-    index = LibMambaIndexHelper(
+    # Imported on first query: libmambapy is the heaviest import of all tools
+    from conda.base.context import context
+    from conda.models.channel import Channel
+    from conda_libmamba_solver.index import LibMambaIndexHelper
+
+    return LibMambaIndexHelper(
         installed_records=(),
         channels=[Channel(channel)],
         subdirs=(platform, "noarch"),
         repodata_fn=context.repodata_fns[-1],
     )
 
-    if subcmd == "depends":
-        raw = index.depends(spec, tree=tree, return_type="raw")
-        return cast("Any", raw).to_dict()
-    else:  # whoneeds
-        raw = index.whoneeds(spec, tree=tree, return_type="raw")
+
+def _load_index(channel: str, platform: str) -> None:
+    """Load the index for channel/platform ahead of its first query (no-op if loaded)."""
+    with _INDEX_LOCKS.setdefault((channel, platform), threading.Lock()):
+        _get_index(channel, platform)
+
+
+# Typical JSON size of one package record in a QueryResult (depends lists, hashes, url);
+# sizing payloads by their record count avoids serializing tens of MB on every miss.
+_PKG_RECORD_BYTES = 1024
+
+
+def _payload_size(payload: dict) -> int:
+    pkgs = payload.get("result", {}).get("pkgs") or ()
+    return _PKG_RECORD_BYTES * (len(pkgs) + 1)
+
+
+@peekable_lru_cache(maxsize=64, sizeof=_payload_size, maxbytes=_RAW_QUERY_CACHE_BYTES)
+def _cached_raw_query(subcmd: str, spec: str, channel: str, platform: str, tree: bool) -> dict:
+    """
+    Execute the underlying query once and cache the full (unpaginated) raw payload.
+
+    For 'depends' / 'whoneeds' we return the raw QueryResult.to_dict() structure.
+    """
+    # One index per channel/platform is loaded and queried at a time; libmamba indexes
+    # are not safe to query concurrently.
+    with _INDEX_LOCKS.setdefault((channel, platform), threading.Lock()):
+        index = _get_index(channel, platform)
+        if subcmd == "depends":
+            raw = index.depends(spec, tree=tree, return_type="raw")
+        else:  # whoneeds
+            raw = index.whoneeds(spec, tree=tree, return_type="raw")
         return cast("Any", raw).to_dict()
 
 
@@ -69,16 +125,25 @@ def _run_repoquery(
     offset: int,
     limit: int,
     get_keys: str = "",
+    response_format: str = "rows",
 ) -> dict[str, Any]:
     """Run the actual repoquery with pagination and field filtering.
 
     Returns a RepoQueryResult dictionary containing query metadata and result payload.
     """
+    from conda.base.context import context
+
     subcmd = subcmd.lower()
     if subcmd not in ALLOWED_SUBCMDS:
         raise ToolError(
             f"Unsupported subcmd '{subcmd}'. Must be one of {sorted(ALLOWED_SUBCMDS)}."
         )
+    response_format = response_format.lower()
+    if response_format not in RESPONSE_FORMATS:
+        raise ToolError(
+            f"Unsupported response_format '{response_format}'. "
+            f"Must be one of {sorted(RESPONSE_FORMATS)}."
+        )
 
     platform = platform or context.subdir
     spec = spec.strip()
@@ -88,27 +153,30 @@ def _run_repoquery(
 
     raw_data = _cached_raw_query(subcmd, spec, channel, platform, tree)
 
-    total = len(raw_data.get("result", {}).get("pkgs", []))
-    if (offset or limit) and "result" in raw_data and "pkgs" in raw_data["result"]:
-        pkgs = raw_data["result"]["pkgs"]
-        slice_ = pkgs[offset : (offset + limit) if limit else None]
-        # Shallow copy outer + inner to avoid mutating cache
-        new_outer = dict(raw_data)
-        new_inner = dict(new_outer.get("result", {}))
-        # Apply field filtering if get_keys is specified
-        new_inner["pkgs"] = [_filter_package_keys(pkg, get_keys) for pkg in slice_]
-        new_inner["offset"] = offset
-        new_inner["limit"] = limit
-        new_inner["total"] = total
-        new_outer["result"] = new_inner
-        result_payload = new_outer
-    else:
+    raw_result = raw_data.get("result", {})
+    pkgs = raw_result.get("pkgs")
+    total = len(pkgs or ())
+    if not limit and total - offset > MAX_UNPAGINATED_PKGS:
+        # Broad queries (e.g. whoneeds python) return many MB; require paging instead
+        raise ToolError(
+            f"{total} packages matched; at most {MAX_UNPAGINATED_PKGS} are returned without "
+            "a limit. Pass limit (and offset) to page through them."
+        )
+    paginate = bool(offset or limit)
+    keys = parse_keys(get_keys)
+    columnar = response_format == "columnar"
+    if pkgs is None or not (paginate or keys or columnar):
+        # Nothing to slice, filter or reshape: hand out the cached payload itself
         result_payload = raw_data
-        # Apply field filtering to all packages if no pagination
-        if get_keys and "result" in result_payload and "pkgs" in result_payload["result"]:
-            result_payload["result"]["pkgs"] = [
-                _filter_package_keys(pkg, get_keys) for pkg in result_payload["result"]["pkgs"]
-            ]
+    else:
+        page = pkgs[offset : (offset + limit) if limit else None] if paginate else pkgs
+        if keys:
+            page = [_filter_package_keys(pkg, keys) for pkg in page]
+        inner = {**raw_result, "pkgs": _columns(page) if columnar else page}
+        if paginate:
+            inner.update(offset=offset, limit=limit, total=total)
+        # Only the outer and inner dicts are new; the cached payload is never mutated
+        result_payload = {**raw_data, "result": inner}
 
     return {
         "query": {
@@ -126,7 +194,7 @@ def _run_repoquery(
     }
 
 
-@register_tool(cache_clearers=[_cached_raw_query.cache_clear])
+@register_tool(cache_clearers=[_cached_raw_query.cache_clear, _get_index.cache_clear])
 async def repoquery(
     subcmd: str,
     spec: str,
@@ -136,6 +204,7 @@ async def repoquery(
     offset: int = 0,
     limit: int = 30,
     get_keys: str = "",
+    response_format: str = "rows",
 ) -> dict[str, Any]:
     """
     Run a conda repoquery (depends | whoneeds) for a single spec
@@ -148,14 +217,17 @@ async def repoquery(
                            "whoneeds": show packages that depend on this package.
         channel (str): e.g. "defaults", "conda-forge", "bioconda", "nvidia"
         platform (str): e.g. "linux-64", "linux-aarch64", "osx-64", "osx-arm64", "win-64"
-        limit (int): for pagination / slicing
+        limit (int): for pagination / slicing (0 = all, up to 1000 packages)
         offset (int): for pagination / slicing
         get_keys (str): Comma-separated field names to include in results.
                        Empty string returns all fields (default).
                        Example: "name,version,url,license" reduces context by ~60-80%.
+        response_format (str): "rows" (default) returns pkgs as a list of records;
+                       "columnar" returns {"schema": [field, ...], "data": [[value, ...], ...]}
+                       with one row per package, naming each field only once.
     """
     try:
-        return await asyncio.to_thread(
+        return await run_blocking_once(
             _run_repoquery,
             subcmd,
             spec,
@@ -165,6 +237,7 @@ async def repoquery(
             offset,
             limit,
             get_keys,
+            response_format,
         )
     except Exception as e:
         raise ToolError(f"'repoquery' failed: {e}") from e
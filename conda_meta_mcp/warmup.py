@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import contextlib
+import threading
+
+WARMUP_ENV = "CONDA_META_MCP_WARMUP"
+
+
+def parse_warmup_pairs(value: str | None) -> list[tuple[str, str]]:
+    """Parse "conda-forge/linux-64,bioconda/linux-64" into (channel, platform) pairs.
+
+    The platform is the last path segment, so channel URLs are accepted as well.
+    """
+    pairs = []
+    for item in (value or "").split(","):
+        channel, sep, platform = item.strip().rpartition("/")
+        if sep and channel and platform:
+            pairs.append((channel, platform))
+    return pairs
+
+
+def _warmup_worker(pairs: list[tuple[str, str]]) -> None:
+    # Imported here: loading the tools is exactly the work kept off the startup path
+    from conda_meta_mcp.tools import pkg_search, repoquery
+
+    for channel, platform in pairs:
+        # Best-effort: a failing pair just stays cold and errors on first real use
+        with contextlib.suppress(Exception):
+            # Any spec loads the repodata; the result set for "python" is small
+            pkg_search._unique_records("python", channel, platform)
+        with contextlib.suppress(Exception):
+            repoquery._load_index(channel, platform)
+
+
+def start_warmup(pairs: list[tuple[str, str]]) -> threading.Thread | None:
+    """Load the repodata of the given channels/platforms in the background."""
+    if not pairs:
+        return None
+    thread = threading.Thread(
+        target=_warmup_worker,
+        args=(pairs,),
+        name="conda-meta-mcp-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -1,20 +1,106 @@
 from __future__ import annotations
 
+import asyncio
+
 import pytest
+import pytest_asyncio
+from fastmcp import Client
 
 from conda_meta_mcp.server import setup_server
+from conda_meta_mcp.tools._disk_cache import CACHE_DIR_ENV
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-network",
+        action="store_true",
+        default=False,
+        help="deselect tests marked 'network' (logic-only run)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if not config.getoption("--no-network"):
+        return
+    deselected = [item for item in items if item.get_closest_marker("network")]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if not item.get_closest_marker("network")]
 
 
-@pytest.fixture
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_disk_cache(tmp_path_factory):
+    """Keep on-disk tool caches out of the user's cache directory during tests."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("disk-cache")))
+    yield
+    mp.undo()
+
+
+@pytest.fixture(scope="session")
 def server():
     """
-    Function-scoped FastMCP server fixture.
+    FastMCP server fixture.
 
-    A fresh server instance is created for each test to avoid any unintended
-    cross-test state leakage. Tests can use this fixture directly:
+    One server is built per test session (setup_server() memoizes it as well);
+    tool-level caches are module-level state either way. Tests can use this
+    fixture directly:
 
         async def test_something(server):
             async with Client(server) as client:
                 ...
     """
     return setup_server()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def warm_caches(request, server):
+    """
+    Load the data most client tests share (conda-forge/osx-arm64 repodata and its
+    libmamba index, the PyPI mapping) in one concurrent burst before the first of them
+    runs.
+
+    Best-effort: failures are ignored here and surface in the tests themselves. Only
+    pulled in through ``client``, so tests measuring memory on a cold server stay cold.
+    """
+    if request.config.getoption("--no-network"):
+        return
+    async with Client(server) as warm:
+        await asyncio.gather(
+            *(
+                warm.call_tool(
+                    "package_search",
+                    {
+                        "package_ref_or_match_spec": spec,
+                        "channel": "conda-forge",
+                        "platform": "osx-arm64",
+                    },
+                )
+                for spec in ("zstd", "numpy")
+            ),
+            warm.call_tool(
+                "repoquery",
+                {
+                    "subcmd": "depends",
+                    "spec": "python",
+                    "channel": "conda-forge",
+                    "platform": "osx-arm64",
+                    "limit": 1,
+                },
+            ),
+            warm.call_tool("pypi_to_conda", {"pypi_name": "numpy", "channel": "conda-forge"}),
+            return_exceptions=True,
+        )
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(server, warm_caches):
+    """
+    Connected FastMCP client shared by all tests of the session.
+
+    The in-memory session (initialize handshake included) is opened once.
+    Tests that need a fresh session, e.g. to check errors raised on connect, can still
+    open their own ``Client(server)``.
+    """
+    async with Client(server) as connected:
+        yield connected
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import types
 
 import conda_meta_mcp.server as server
@@ -5,6 +7,7 @@ import conda_meta_mcp.server as server
 
 def test_setup_server__called__tools_registered(monkeypatch):
     tools = []
+    resources = []
     instances = []
 
     class FakeFastMCP:
@@ -17,12 +20,44 @@ def test_setup_server__called__tools_registered(monkeypatch):
             tools.append(name or func.__name__)
             return func
 
-    monkeypatch.setattr(server, "FastMCP", FakeFastMCP)
+        def resource(self, uri, name=None, mime_type=None):
+            resources.append(uri)
+            return lambda func: func
+
+    monkeypatch.setattr(server, "_SERVER_CACHE", {})
+    monkeypatch.setattr("fastmcp.FastMCP", FakeFastMCP)
     m = server.setup_server()
 
     assert m.name == server.SERVICE_NAME
     assert m.transforms is None
     assert "info" in tools
+    assert "conda-meta-mcp://info" in resources
+
+
+def test_setup_server__called_twice__same_instance(monkeypatch):
+    class FakeFastMCP:
+        def __init__(self, name, transforms=None):
+            pass
+
+        def tool(self, func, name=None):
+            return func
+
+        def resource(self, uri, name=None, mime_type=None):
+            return lambda func: func
+
+    monkeypatch.setattr(server, "_SERVER_CACHE", {})
+    monkeypatch.setattr("fastmcp.FastMCP", FakeFastMCP)
+    monkeypatch.setattr(server, "_build_code_mode_transform", lambda: object())
+    monkeypatch.setattr("conda_meta_mcp.tools.discover_tools", lambda: [])
+    monkeypatch.setattr("conda_meta_mcp.tools.discover_resources", lambda: [])
+
+    assert server.setup_server() is server.setup_server()
+    assert server.setup_server(code=True) is not server.setup_server()
+
+
+def test_server_import__fastmcp_deferred():
+    code = "import sys, conda_meta_mcp.server; sys.exit('fastmcp' in sys.modules)"
+    subprocess.run([sys.executable, "-c", code], check=True)
 
 
 def test_setup_server__code_mode_enabled(monkeypatch):
@@ -36,8 +71,12 @@ def test_setup_server__code_mode_enabled(monkeypatch):
         def tool(self, func, name=None):
             return func
 
+        def resource(self, uri, name=None, mime_type=None):
+            return lambda func: func
+
     monkeypatch.setattr(server, "_build_code_mode_transform", lambda: sentinel)
-    monkeypatch.setattr(server, "FastMCP", FakeFastMCP)
+    monkeypatch.setattr(server, "_SERVER_CACHE", {})
+    monkeypatch.setattr("fastmcp.FastMCP", FakeFastMCP)
     m = server.setup_server(code=True)
 
     assert m.name == server.SERVICE_NAME
@@ -98,6 +137,7 @@ def test_run_cmd__starts_parent_watcher_before_setup(monkeypatch):
 
     monkeypatch.setattr(server, "setup_server", fake_setup_server)
     monkeypatch.setattr(server, "start_parent_watcher", fake_start_watcher)
+    monkeypatch.setattr(server, "start_warmup", lambda pairs: order.append(("warmup", pairs)))
 
     server.run_cmd(
         types.SimpleNamespace(
@@ -105,10 +145,11 @@ def test_run_cmd__starts_parent_watcher_before_setup(monkeypatch):
             code=False,
             transport="streamable-http",
             port=4042,
+            warmup="conda-forge/linux-64",
         )
     )
 
-    assert order == ["watcher", "setup"]
+    assert order == ["watcher", "setup", ("warmup", [("conda-forge", "linux-64")])]
     assert calls["kw"] == {
         "transport": "streamable-http",
         "show_banner": False,
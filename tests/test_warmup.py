@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+import conda_meta_mcp.warmup as warmup
+
+
+def test_parse_warmup_pairs():
+    assert warmup.parse_warmup_pairs(
+        " conda-forge/linux-64, https://repo.example.invalid/main/osx-arm64,,bogus"
+    ) == [
+        ("conda-forge", "linux-64"),
+        ("https://repo.example.invalid/main", "osx-arm64"),
+    ]
+    assert warmup.parse_warmup_pairs(None) == []
+
+
+def test_start_warmup__nothing_to_do():
+    assert warmup.start_warmup([]) is None
+
+
+def test_warmup_worker__loads_search_and_index_best_effort():
+    from conda_meta_mcp.tools import pkg_search, repoquery
+
+    with (
+        patch.object(pkg_search, "_unique_records", side_effect=OSError("offline")) as search,
+        patch.object(repoquery, "_load_index") as load_index,
+    ):
+        thread = warmup.start_warmup([("conda-forge", "linux-64"), ("bioconda", "noarch")])
+        thread.join(5)
+
+    assert search.call_count == 2
+    assert [c.args for c in load_index.call_args_list] == [
+        ("conda-forge", "linux-64"),
+        ("bioconda", "noarch"),
+    ]
@@ -1,11 +1,15 @@
 import asyncio
-import time
+import contextlib
+import ctypes
+import gc
+import sys
 from typing import Any
 
 import psutil
 import pytest
 
-from conda_meta_mcp.server import setup_server
+from conda_meta_mcp.tools import cache_utils
+from conda_meta_mcp.tools.cache_utils import peekable_lru_cache
 
 
 def _current_rss_mb() -> float:
@@ -14,52 +18,60 @@ def _current_rss_mb() -> float:
     return process.memory_info().rss / (1024 * 1024)
 
 
-async def _hammer_tools(client: Any, iterations: int = 2) -> None:
-    """Call memory-heavy tools repeatedly to exercise caches."""
-    for _ in range(iterations):
-        # package_search: hits SubdirData and _full_package_search cache
-        await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "numpy",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 50,
-                "get_keys": "",
-            },
-        )
+def _release_memory() -> None:
+    """Collect garbage and, on glibc, hand freed heap pages back to the OS."""
+    gc.collect()
+    if sys.platform == "linux":
+        # Without malloc_trim freed arenas stay mapped and RSS lags behind; absent on musl
+        with contextlib.suppress(OSError, AttributeError):
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
 
-        # repoquery: uses libmamba and _cached_raw_query cache
-        await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "tree": True,
-                "offset": 0,
-                "limit": 100,
-                "get_keys": "",
-            },
-        )
 
-        # pypi_to_conda: exercises _map_pypi_name cache
-        await client.call_tool(
-            "pypi_to_conda",
-            {
-                "pypi_name": "numpy",
-                "channel": "conda-forge",
-            },
+async def _hammer_tools(client: Any, iterations: int = 2) -> None:
+    """Call memory-heavy tools repeatedly (concurrently per round) to exercise caches."""
+    for _ in range(iterations):
+        await asyncio.gather(
+            # package_search: hits SubdirData and _full_package_search cache
+            client.call_tool(
+                "package_search",
+                {
+                    "package_ref_or_match_spec": "numpy",
+                    "channel": "conda-forge",
+                    "platform": "osx-arm64",
+                    "limit": 50,
+                    "get_keys": "",
+                },
+            ),
+            # repoquery: uses libmamba and _cached_raw_query cache
+            client.call_tool(
+                "repoquery",
+                {
+                    "subcmd": "depends",
+                    "spec": "python",
+                    "channel": "conda-forge",
+                    "platform": "osx-arm64",
+                    "tree": True,
+                    "offset": 0,
+                    "limit": 100,
+                    "get_keys": "",
+                },
+            ),
+            # pypi_to_conda: exercises _map_pypi_name cache
+            client.call_tool(
+                "pypi_to_conda",
+                {
+                    "pypi_name": "numpy",
+                    "channel": "conda-forge",
+                },
+            ),
         )
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_cache_maintenance__called__memory_freed() -> None:
+async def test_cache_maintenance__called__memory_freed(server) -> None:
     from fastmcp.client import Client
 
-    server = setup_server()
-
     async with Client(server) as client:
         baseline = _current_rss_mb()
 
@@ -68,14 +80,133 @@ async def test_cache_maintenance__called__memory_freed() -> None:
 
         await client.call_tool("cache_maintenance", {})
 
-        await asyncio.sleep(0.5)
-        import gc
-
-        gc.collect()
-        time.sleep(0.5)
-
-        after_cleanup = _current_rss_mb()
+        # Poll until RSS has dropped (usually within a few tens of ms) instead of sleeping
+        for _ in range(40):
+            _release_memory()
+            after_cleanup = _current_rss_mb()
+            if after_load - after_cleanup >= 128:
+                break
+            await asyncio.sleep(0.025)
 
         assert after_load >= baseline
         assert after_cleanup <= after_load
         assert after_load - after_cleanup >= 128
+
+
+def test_peekable_lru_cache__peek_does_not_compute():
+    calls = []
+
+    @peekable_lru_cache(maxsize=2)
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square.cache_peek(3) is None
+    assert square(3) == 9
+    assert square(3) == 9
+    assert square.cache_peek(3) == 9
+    assert calls == [3]
+
+
+def test_peekable_lru_cache__evicts_least_recently_used():
+    @peekable_lru_cache(maxsize=2)
+    def ident(x):
+        return x
+
+    ident(1)
+    ident(2)
+    ident.cache_peek(1)  # refresh 1, so 2 is evicted next
+    ident(3)
+
+    assert ident.cache_peek(1) == 1
+    assert ident.cache_peek(2) is None
+    assert ident.cache_peek(3) == 3
+
+    ident.cache_clear()
+    assert ident.cache_peek(1) is None
+
+
+def test_peekable_lru_cache__evicts_beyond_maxbytes():
+    @peekable_lru_cache(maxsize=10, sizeof=len, maxbytes=10)
+    def payload(name, size):
+        return name * size
+
+    payload("a", 4)
+    payload("b", 4)
+    payload("c", 4)  # 12 > 10: "a" is evicted
+
+    assert payload.cache_peek("a", 4) is None
+    assert payload.cache_peek("b", 4) == "bbbb"
+    assert payload.cache_bytes() == 8
+
+    payload("d", 11)  # larger than the whole budget: returned but not cached
+    assert payload.cache_peek("d", 11) is None
+    assert payload.cache_peek("c", 4) == "cccc"
+    assert payload.cache_bytes() == 8
+
+    payload("e", 2)
+    payload.cache_clear()
+    assert payload.cache_bytes() == 0
+
+
+def test_register_external_cache_clearer__deduplicated(monkeypatch):
+    monkeypatch.setattr(cache_utils, "_external_cache_clearers", {})
+    calls = []
+
+    @peekable_lru_cache(maxsize=1)
+    def cached():
+        return 1
+
+    def clearer():
+        calls.append("plain")
+
+    for _ in range(3):
+        cache_utils.register_external_cache_clearer(clearer)
+        # each attribute access creates a new, but equal, bound method
+        cache_utils.register_external_cache_clearer(cached.cache_clear)
+
+    cache_utils.clear_external_library_caches()
+
+    assert calls == ["plain"]
+    assert len(cache_utils._external_cache_clearers) == 2
+
+
+def test_peekable_lru_cache__shared_budget_evicts_across_caches():
+    budget = cache_utils.ByteBudget(10)
+
+    @peekable_lru_cache(maxsize=10, sizeof=len, budget=budget)
+    def first(x):
+        return x
+
+    @peekable_lru_cache(maxsize=10, sizeof=len, budget=budget)
+    def second(x):
+        return x
+
+    first("aaaa")
+    second("bbbb")
+    first.cache_peek("aaaa")  # refresh, so "bbbb" is the oldest entry of the budget
+    second("cccc")  # 12 > 10: evicts "bbbb" from its own cache
+
+    assert first.cache_peek("aaaa") == "aaaa"
+    assert second.cache_peek("bbbb") is None
+    assert second.cache_peek("cccc") == "cccc"
+    assert budget.nbytes() == 8
+
+    first.cache_clear()
+    assert budget.nbytes() == second.cache_bytes() == 4
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, 64), ("", 64), ("128", 128), ("64MB", 64), ("1G", 64), ("0", 64), ("-5", 64)],
+)
+def test_env_bytes__invalid_values_fall_back_to_default(monkeypatch, caplog, value, expected):
+    name = "CONDA_META_MCP_TEST_CACHE_BYTES"
+    if value is None:
+        monkeypatch.delenv(name, raising=False)
+    else:
+        monkeypatch.setenv(name, value)
+
+    assert cache_utils.env_bytes(name, default=64) == expected
+    warned = any(name in record.getMessage() for record in caplog.records)
+    assert warned == (value not in (None, "", "128"))
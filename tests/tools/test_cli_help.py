@@ -1,186 +1,174 @@
 from __future__ import annotations
 
+import asyncio
+import re
+
 import pytest
-from fastmcp import Client
+import pytest_asyncio
 from fastmcp.exceptions import ToolError
 
 from conda_meta_mcp.tools import cli_help as cli_help_module
 
+_SUBCMD_RE = re.compile("create|install|list", re.IGNORECASE)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def full_help(client) -> str:
+    """Full (unfiltered) conda help as returned by the tool, fetched once per module."""
+    result = await client.call_tool("cli_help", {"tool": "conda", "grep": ""})
+    return result.data
+
 
 @pytest.mark.asyncio
-async def test_cli_help__success(server):
-    async with Client(server) as client:
-        result = await client.call_tool("cli_help", {})
-        assert isinstance(result.data, str)
-        assert "repoquery" in result.data
+async def test_cli_help__success(client):
+    result = await client.call_tool("cli_help", {})
+    assert isinstance(result.data, str)
+    assert "repoquery" in result.data
 
 
 @pytest.mark.asyncio
-async def test_cli_help__unknown_tool_error(server):
-    with pytest.raises(ToolError):
-        async with Client(server) as client:
-            await client.call_tool("cli_help", {"tool": "unknown_tool_xyz"})
+async def test_cli_help__unknown_tool_error(client):
+    with pytest.raises(ToolError, match="Unknown/ not yet implemented tool: unknown_tool_xyz"):
+        await client.call_tool("cli_help", {"tool": "unknown_tool_xyz"})
 
 
 @pytest.mark.asyncio
 async def test_cli_help__disabled_when_dependency_missing(monkeypatch):
-    cli_help_module._get_conda_help.cache_clear()
+    cli_help_module._clear_conda_help_cache()
     monkeypatch.setattr(cli_help_module, "Manpage", None)
 
     with pytest.raises(ToolError) as exc:
         await cli_help_module.cli_help()
 
     assert str(exc.value) == "Disabled, enable via installing the package argparse-manpage"
-    cli_help_module._get_conda_help.cache_clear()
+    cli_help_module._clear_conda_help_cache()
+
+
+def test_cli_help__rendered_help_loaded_from_disk_cache(monkeypatch):
+    cli_help_module._clear_conda_help_cache()
+    monkeypatch.setattr(cli_help_module, "_conda_help_cache_key", lambda: "test-key")
+    cli_help_module._HELP_DISK_CACHE.set("test-key", "conda persisted help")
+
+    assert cli_help_module._get_conda_help() == "conda persisted help"
+    cli_help_module._clear_conda_help_cache()
+
+
+@pytest.mark.parametrize(
+    "grep", ["install", "INSTALL|create", "^  -", "json$", r"\s+--", r"\Aconda"]
+)
+def test_cli_help__grep_lines_matches_per_line_search(monkeypatch, grep):
+    """Single-buffer grep must select exactly the lines a per-line search would."""
+    help_text = "conda install\n  -n NAME\n  --json\n\nconda create --json\nUPDATE\n"
+    monkeypatch.setattr(cli_help_module, "_CACHED_HELP", help_text)
+    monkeypatch.setattr(cli_help_module, "_CACHED_INDEX", None)
+
+    pattern = re.compile(grep, re.IGNORECASE)
+    expected = [line for line in help_text.splitlines() if pattern.search(line)]
+
+    assert cli_help_module._cli_help(grep=grep) == "\n".join(expected)
 
 
 @pytest.mark.asyncio
-async def test_cli_help__grep_empty_returns_all(server):
+async def test_cli_help__grep_empty_returns_all(full_help):
     """Empty grep should return all lines (backward compatible)."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "",  # Empty = all lines
-            },
-        )
-        data = result.data
-        lines = data.strip().split("\n")
-        # Full help should have 1000+ lines
-        assert len(lines) > 1000
+    lines = full_help.strip().splitlines()
+    # Full help should have 1000+ lines
+    assert len(lines) > 1000
 
 
 @pytest.mark.asyncio
-async def test_cli_help__grep_filters_lines(server):
+async def test_cli_help__grep_filters_lines(client):
     """grep parameter should filter to only matching lines."""
-    async with Client(server) as client:
-        # Search for install-related commands
-        result = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "install",
-            },
-        )
-        data = result.data
-        lines = [line for line in data.strip().split("\n") if line.strip()]
-        assert lines
-
-        # All non-empty lines should contain "install" (case-insensitive)
-        for line in lines:
-            assert "install" in line.lower()
+    # Search for install-related commands
+    result = await client.call_tool(
+        "cli_help",
+        {
+            "tool": "conda",
+            "grep": "install",
+        },
+    )
+    data = result.data
+    lines = [line for line in data.splitlines() if line.strip()]
+    assert lines
+
+    # All non-empty lines should contain "install" (case-insensitive)
+    for line in lines:
+        assert "install" in line.lower()
 
 
 @pytest.mark.asyncio
-async def test_cli_help__grep_context_reduction(server):
+async def test_cli_help__grep_context_reduction(client, full_help):
     """grep should reduce context usage by ~90% for targeted queries."""
-    async with Client(server) as client:
-        # Get full help
-        full_result = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "",
-            },
-        )
-        full_size = len(full_result.data)
+    filtered_result = await client.call_tool(
+        "cli_help", {"tool": "conda", "grep": "install|update|create"}
+    )
+    full_size = len(full_help)
+    filtered_size = len(filtered_result.data)
 
-        # Get filtered help
-        filtered_result = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "install|update|create",
-            },
-        )
-        filtered_size = len(filtered_result.data)
-
-        # Should be significantly smaller (~90% or more)
-        reduction = (full_size - filtered_size) / full_size
-        assert reduction > 0.85  # At least 85% reduction (typically 90%+)
+    # Should be significantly smaller (~90% or more)
+    reduction = (full_size - filtered_size) / full_size
+    assert reduction > 0.85  # At least 85% reduction (typically 90%+)
 
 
 @pytest.mark.asyncio
-async def test_cli_help__grep_case_insensitive(server):
+async def test_cli_help__grep_case_insensitive(client):
     """grep should be case-insensitive."""
-    async with Client(server) as client:
-        # Search lowercase
-        result_lower = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "install",
-            },
-        )
-        lower_lines = len([line for line in result_lower.data.split("\n") if line.strip()])
-
-        # Search uppercase
-        result_upper = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "INSTALL",
-            },
-        )
-        upper_lines = len([line for line in result_upper.data.split("\n") if line.strip()])
+    # Search lowercase and uppercase
+    result_lower, result_upper = await asyncio.gather(
+        client.call_tool("cli_help", {"tool": "conda", "grep": "install"}),
+        client.call_tool("cli_help", {"tool": "conda", "grep": "INSTALL"}),
+    )
+    lower_lines = sum(1 for line in result_lower.data.splitlines() if line.strip())
+    upper_lines = sum(1 for line in result_upper.data.splitlines() if line.strip())
 
-        # Should return same number of results (case-insensitive)
-        assert lower_lines == upper_lines
+    # Should return same number of results (case-insensitive)
+    assert lower_lines == upper_lines
 
 
 @pytest.mark.asyncio
-async def test_cli_help__grep_regex_patterns(server):
+async def test_cli_help__grep_regex_patterns(client):
     """grep should support regex patterns."""
-    async with Client(server) as client:
-        # Use regex alternation for common conda subcommands
-        result = await client.call_tool(
-            "cli_help",
-            {
-                "tool": "conda",
-                "grep": "create|install|list",  # Lines containing create, install, or list
-            },
-        )
-        data = result.data
-        lines = [line for line in data.strip().split("\n") if line.strip()]
-
-        # Should have some matching lines
-        assert len(lines) > 0
+    # Use regex alternation for common conda subcommands
+    result = await client.call_tool(
+        "cli_help",
+        {
+            "tool": "conda",
+            "grep": "create|install|list",  # Lines containing create, install, or list
+        },
+    )
+    data = result.data
+    lines = [line for line in data.splitlines() if line.strip()]
 
-        # Each line should match the pattern (case-insensitive)
-        import re
+    # Should have some matching lines
+    assert len(lines) > 0
 
-        pattern = re.compile("create|install|list", re.IGNORECASE)
-        for line in lines:
-            assert pattern.search(line)
+    # Each line should match the pattern (case-insensitive)
+    search = _SUBCMD_RE.search
+    assert all(search(line) for line in lines), [line for line in lines if not search(line)]
 
 
 @pytest.mark.asyncio
-async def test_cli_help__grep_invalid_regex_error(server):
+async def test_cli_help__grep_invalid_regex_error(client):
     """grep with invalid regex should raise error."""
     with pytest.raises(ToolError):
-        async with Client(server) as client:
-            await client.call_tool(
-                "cli_help",
-                {
-                    "tool": "conda",
-                    "grep": "[invalid(regex",  # Invalid regex syntax
-                },
-            )
-
-
-@pytest.mark.asyncio
-async def test_cli_help__backward_compat_no_grep_param(server):
-    """Old cli_help calls without grep should still work."""
-    async with Client(server) as client:
-        result = await client.call_tool(
+        await client.call_tool(
             "cli_help",
             {
                 "tool": "conda",
-                # No grep parameter
+                "grep": "[invalid(regex",  # Invalid regex syntax
             },
         )
-        data = result.data
-        lines = data.strip().split("\n")
-        # Should return all lines
-        assert len(lines) > 1000
+
+
+@pytest.mark.asyncio
+async def test_cli_help__backward_compat_no_grep_param(client, full_help):
+    """Old cli_help calls without grep should still work."""
+    result = await client.call_tool(
+        "cli_help",
+        {
+            "tool": "conda",
+            # No grep parameter
+        },
+    )
+    # Should return all lines
+    assert result.data == full_help
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import pkgutil
+
+import conda_meta_mcp.tools as tools_pkg
+from conda_meta_mcp.tools.discovery import TOOL_MODULES
+
+NON_TOOL_MODULES = {"cache_utils", "discovery", "registry"}
+
+
+def test_tool_modules__match_package_contents():
+    modules = {
+        mod_info.name
+        for mod_info in pkgutil.iter_modules(tools_pkg.__path__)
+        if not mod_info.name.startswith("_") and mod_info.name not in NON_TOOL_MODULES
+    }
+
+    assert set(TOOL_MODULES) == modules
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from conda_meta_mcp.tools import _disk_cache
+from conda_meta_mcp.tools.cache_utils import clear_persistent_caches
+
+
+def test_disk_cache__roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setenv(_disk_cache.CACHE_DIR_ENV, str(tmp_path))
+    cache = _disk_cache.DiskCache("roundtrip", ttl=60)
+
+    assert cache.get("bin/fzf") is None
+    cache.set("bin/fzf", {"ok": True, "artifacts": ["a", "b"]})
+
+    assert cache.get("bin/fzf") == {"ok": True, "artifacts": ["a", "b"]}
+    assert (tmp_path / "roundtrip.sqlite3").exists()
+
+
+def test_disk_cache__expired_entries_ignored(tmp_path, monkeypatch):
+    monkeypatch.setenv(_disk_cache.CACHE_DIR_ENV, str(tmp_path))
+    cache = _disk_cache.DiskCache("expiry", ttl=60)
+    cache.set("key", "value")
+
+    now = _disk_cache.time.time()
+    monkeypatch.setattr(_disk_cache.time, "time", lambda: now + 120)
+
+    assert cache.get("key") is None
+
+
+def test_disk_cache__cleared_by_persistent_clearers(tmp_path, monkeypatch):
+    monkeypatch.setenv(_disk_cache.CACHE_DIR_ENV, str(tmp_path))
+    cache = _disk_cache.DiskCache("clearing", ttl=60)
+    cache.set("key", "value")
+
+    clear_persistent_caches()
+
+    assert cache.get("key") is None
+
+
+def test_disk_cache__unwritable_directory_is_a_miss(tmp_path, monkeypatch):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setenv(_disk_cache.CACHE_DIR_ENV, str(blocker))
+    cache = _disk_cache.DiskCache("unwritable", ttl=60)
+
+    cache.set("key", "value")
+
+    assert cache.get("key") is None
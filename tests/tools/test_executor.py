@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from conda_meta_mcp.tools._executor import _INFLIGHT, run_blocking, run_blocking_once
+
+_REQUEST_ID: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
+
+
+def _whoami(suffix: str) -> tuple[str, str]:
+    return threading.current_thread().name, _REQUEST_ID.get() + suffix
+
+
+@pytest.mark.asyncio
+async def test_run_blocking__uses_tool_pool_and_keeps_context():
+    _REQUEST_ID.set("req-1")
+
+    thread_name, value = await run_blocking(_whoami, "/a")
+
+    assert thread_name.startswith("mcp-tool")
+    assert value == "req-1/a"
+
+
+@pytest.mark.asyncio
+async def test_run_blocking__propagates_exceptions():
+    def _boom() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        await run_blocking(_boom)
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_once__concurrent_duplicates_share_one_call():
+    release = threading.Event()
+    calls: list[str] = []
+
+    def _slow(name: str) -> str:
+        calls.append(name)
+        release.wait(5)
+        return name.upper()
+
+    pending = [asyncio.ensure_future(run_blocking_once(_slow, n)) for n in ("a", "a", "b")]
+    await asyncio.sleep(0.05)
+    release.set()
+
+    assert await asyncio.gather(*pending) == ["A", "A", "B"]
+    assert sorted(calls) == ["a", "b"]
+    assert not _INFLIGHT
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_once__exception_shared_then_retried():
+    calls = 0
+
+    def _fail() -> None:
+        nonlocal calls
+        calls += 1
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        run_blocking_once(_fail), run_blocking_once(_fail), return_exceptions=True
+    )
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert calls == 1
+
+    with pytest.raises(ValueError):
+        await run_blocking_once(_fail)
+    assert calls == 2
@@ -1,97 +1,113 @@
+from __future__ import annotations
+
+import re
+
 import pytest
-from fastmcp import Client
+import pytest_asyncio
 from fastmcp.exceptions import ToolError
 
+from conda_meta_mcp.tools import file_path_search as file_path_search_module
+
+_INVALID_INPUT = re.compile("invalid input", re.IGNORECASE)
+
 
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def fzf_page(client) -> dict:
+    """First three bin/fzf artifacts, fetched once per module."""
+    result = await client.call_tool(
+        "file_path_search",
+        {
+            "path": "bin/fzf",
+            "channel": "conda-forge",
+            "limit": 3,
+            "offset": 0,
+        },
+    )
+    return result.data
+
+
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_file_path_search__success(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "file_path_search",
-            {
-                "path": "bin/fzf",
-                "channel": "conda-forge",
-                "limit": 3,
-                "offset": 0,
-            },
-        )
-        data = result.data
-        assert "query_path" in data
-        assert "artifacts" in data
-        assert "count" in data
-        assert "total" in data
-        assert "limit" in data
-        assert "offset" in data
-        assert data["query_path"] == "bin/fzf"
-        assert isinstance(data["artifacts"], list)
-        assert data["count"] == len(data["artifacts"])
-        assert data["total"] >= data["count"]
-        assert data["limit"] == 3
-        assert data["offset"] == 0
+async def test_file_path_search__success(fzf_page):
+    data = fzf_page
+    assert "query_path" in data
+    assert "artifacts" in data
+    assert "count" in data
+    assert "total" in data
+    assert "limit" in data
+    assert "offset" in data
+    assert data["query_path"] == "bin/fzf"
+    assert isinstance(data["artifacts"], list)
+    assert data["count"] == len(data["artifacts"])
+    assert data["total"] >= data["count"]
+    assert data["limit"] == 3
+    assert data["offset"] == 0
+
+
+@pytest.mark.network
+@pytest.mark.asyncio
+async def test_file_path_search__pagination(client, fzf_page):
+    # One real paged call checks the server's offset/limit; the expectation is
+    # sliced from the shared first page
+    r1 = await client.call_tool(
+        "file_path_search",
+        {"path": "bin/fzf", "channel": "conda-forge", "limit": 1, "offset": 1},
+    )
+    d1 = r1.data
+
+    assert d1["limit"] == 1
+    assert d1["offset"] == 1
+    assert d1["artifacts"] == fzf_page["artifacts"][1:2]
+
+    # If there are at least two matching artifacts, ensure pagination returns different items
+    if fzf_page["total"] >= 2:
+        assert d1["artifacts"][0] != fzf_page["artifacts"][0]
 
 
 @pytest.mark.asyncio
-async def test_file_path_search__pagination(server):
-    async with Client(server) as client:
-        r0 = await client.call_tool(
+async def test_file_path_search__error_on_empty_input(client):
+    with pytest.raises(ToolError, match=_INVALID_INPUT):
+        await client.call_tool(
             "file_path_search",
             {
-                "path": "bin/fzf",
+                "path": "",
                 "channel": "conda-forge",
-                "limit": 1,
-                "offset": 0,
             },
         )
-        r1 = await client.call_tool(
+
+
+@pytest.mark.asyncio
+async def test_file_path_search__unsupported_channel(client):
+    with pytest.raises(ToolError) as exc:
+        await client.call_tool(
             "file_path_search",
             {
                 "path": "bin/fzf",
-                "channel": "conda-forge",
-                "limit": 1,
-                "offset": 1,
+                "channel": "defaults",
             },
         )
+    message = str(exc.value)
+    assert "No data available for channel 'defaults'" in message
+    assert "Try a different channel" in message
 
-        d0 = r0.data
-        d1 = r1.data
-
-        assert "artifacts" in d0
-        assert "artifacts" in d1
-        assert d0["limit"] == 1
-        assert d1["limit"] == 1
 
-        total = d0.get("total", d0.get("count", 0))
+def test_file_path_search__stripped_path_used_as_raw_key(monkeypatch):
+    seen = []
 
-        # If there are at least two matching artifacts, ensure pagination returns different items
-        if total >= 2:
-            assert d0["artifacts"][0] != d1["artifacts"][0]
+    def fake_raw(query):
+        seen.append(query)
+        return {"ok": True, "artifacts": ["a", "b", "c"]}
 
+    monkeypatch.setattr(file_path_search_module, "_file_path_search_raw", fake_raw)
 
-@pytest.mark.asyncio
-async def test_file_path_search__error_on_empty_input(server):
-    async with Client(server) as client:
-        with pytest.raises(ToolError) as exc:
-            await client.call_tool(
-                "file_path_search",
-                {
-                    "path": "",
-                    "channel": "conda-forge",
-                },
-            )
-        assert "invalid input" in str(exc.value).lower()
-
+    data = file_path_search_module._file_path_search("  bin/fzf\n", "conda-forge", 2, 1)
 
-@pytest.mark.asyncio
-async def test_file_path_search__unsupported_channel(server):
-    async with Client(server) as client:
-        with pytest.raises(ToolError) as exc:
-            await client.call_tool(
-                "file_path_search",
-                {
-                    "path": "bin/fzf",
-                    "channel": "defaults",
-                },
-            )
-        message = str(exc.value)
-        assert "No data available for channel 'defaults'" in message
-        assert "Try a different channel" in message
+    assert seen == ["bin/fzf"]
+    assert data == {
+        "query_path": "bin/fzf",
+        "artifacts": ["b", "c"],
+        "count": 2,
+        "total": 3,
+        "limit": 2,
+        "offset": 1,
+    }
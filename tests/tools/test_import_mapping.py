@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import re
+
 import pytest
-from fastmcp import Client
+import pytest_asyncio
 from fastmcp.exceptions import ToolError
 
 from conda_meta_mcp.tools import import_mapping as import_mapping_module
@@ -15,75 +17,88 @@ VALID_HEURISTICS = {
     "fallback",
 }
 
+_INVALID_INPUT = re.compile("invalid input", re.IGNORECASE)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def numpy_mapping(client) -> dict:
+    """Unfiltered mapping of "numpy", fetched once per module."""
+    result = await client.call_tool(
+        "import_mapping",
+        {
+            "import_name": "numpy",
+            "channel": "conda-forge",
+            "get_keys": "",  # Empty = all fields
+        },
+    )
+    return result.data
+
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_import_mapping__success_basic(server):
+async def test_import_mapping__success_basic(client):
     """
     Basic happy-path test: provide a dotted import and validate the response schema
     and invariants. We intentionally do NOT assert an exact best_package value
     (to stay resilient to upstream mapping evolution) but we enforce structural
     correctness and heuristic membership.
     """
-    async with Client(server) as client:
-        # Use a very common library import that should resolve deterministically.
-        result = await client.call_tool(
-            "import_mapping",
-            {
-                "import_name": "numpy.linalg",
-                "channel": "conda-forge",
-            },
-        )
-        data = result.data
-        # Schema keys
-        assert sorted(data.keys()) == [
-            "best_package",
-            "candidate_packages",
-            "heuristic",
-            "normalized_import",
-            "query_import",
-        ]
-        # Field relationships
-        assert data["query_import"] == "numpy.linalg"
-        assert data["normalized_import"] == "numpy"
-        assert isinstance(data["candidate_packages"], list)
-        assert all(isinstance(x, str) for x in data["candidate_packages"])
-        assert data["heuristic"] in VALID_HEURISTICS
-        assert isinstance(data["best_package"], str)
+    # Use a very common library import that should resolve deterministically.
+    result = await client.call_tool(
+        "import_mapping",
+        {
+            "import_name": "numpy.linalg",
+            "channel": "conda-forge",
+        },
+    )
+    data = result.data
+    # Schema keys
+    assert sorted(data.keys()) == [
+        "best_package",
+        "candidate_packages",
+        "heuristic",
+        "normalized_import",
+        "query_import",
+    ]
+    # Field relationships
+    assert data["query_import"] == "numpy.linalg"
+    assert data["normalized_import"] == "numpy"
+    assert isinstance(data["candidate_packages"], list)
+    assert all(isinstance(x, str) for x in data["candidate_packages"])
+    assert data["heuristic"] in VALID_HEURISTICS
+    assert isinstance(data["best_package"], str)
 
 
 @pytest.mark.asyncio
-async def test_import_mapping__error_on_empty_input(server):
+async def test_import_mapping__error_on_empty_input(client):
     """
     Passing an empty string should surface a ToolError (input validation branch).
     """
-    async with Client(server) as client:
-        with pytest.raises(ToolError) as exc:
-            await client.call_tool(
-                "import_mapping",
-                {
-                    "import_name": "",
-                    "channel": "conda-forge",
-                },
-            )
-        # Sanity check on error message clarity
-        assert "invalid input" in str(exc.value).lower()
+    with pytest.raises(ToolError, match=_INVALID_INPUT):
+        await client.call_tool(
+            "import_mapping",
+            {
+                "import_name": "",
+                "channel": "conda-forge",
+            },
+        )
 
 
 @pytest.mark.asyncio
 async def test_import_mapping__disabled_when_dependency_missing(monkeypatch):
-    import_mapping_module._map_import.cache_clear()
+    import_mapping_module._map_import_full.cache_clear()
     monkeypatch.setattr(import_mapping_module, "get_pkgs_for_import", None)
 
     with pytest.raises(ToolError) as exc:
         await import_mapping_module.import_mapping("numpy", "conda-forge")
 
     assert str(exc.value) == "Disabled, enable via installing the package conda-forge-metadata"
-    import_mapping_module._map_import.cache_clear()
+    import_mapping_module._map_import_full.cache_clear()
 
 
 @pytest.mark.asyncio
 async def test_import_mapping__unsupported_channel_before_dependency_missing(monkeypatch):
-    import_mapping_module._map_import.cache_clear()
+    import_mapping_module._map_import_full.cache_clear()
     monkeypatch.setattr(import_mapping_module, "get_pkgs_for_import", None)
 
     with pytest.raises(ToolError) as exc:
@@ -92,47 +107,36 @@ async def test_import_mapping__unsupported_channel_before_dependency_missing(mon
     message = str(exc.value)
     assert "No data available for channel 'defaults'" in message
     assert "Try a different channel" in message
-    import_mapping_module._map_import.cache_clear()
+    import_mapping_module._map_import_full.cache_clear()
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_import_mapping__get_keys_empty_returns_all(server):
+async def test_import_mapping__get_keys_empty_returns_all(numpy_mapping):
     """Empty get_keys should return all fields (backward compatible)."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "import_mapping",
-            {
-                "import_name": "numpy",
-                "channel": "conda-forge",
-                "get_keys": "",  # Empty = all fields
-            },
-        )
-        data = result.data
-        # Should have all 5 fields
-        expected_keys = {
-            "query_import",
-            "normalized_import",
-            "best_package",
-            "candidate_packages",
-            "heuristic",
-        }
-        assert set(data.keys()) == expected_keys
-
-
+    # Should have all 5 fields
+    expected_keys = {
+        "query_import",
+        "normalized_import",
+        "best_package",
+        "candidate_packages",
+        "heuristic",
+    }
+    assert set(numpy_mapping.keys()) == expected_keys
+
+
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_import_mapping__get_keys_filters_result(server):
+async def test_import_mapping__get_keys_filters_result(client, numpy_mapping):
     """get_keys parameter should filter result to only requested fields."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "import_mapping",
-            {
-                "import_name": "numpy",
-                "channel": "conda-forge",
-                "get_keys": "best_package,heuristic",  # Only these 2 fields
-            },
-        )
-        data = result.data
-        # Should have ONLY the requested fields
-        assert set(data.keys()) == {"best_package", "heuristic"}
-        assert "query_import" not in data
-        assert "normalized_import" not in data
+    result = await client.call_tool(
+        "import_mapping",
+        {
+            "import_name": "numpy",
+            "channel": "conda-forge",
+            "get_keys": "best_package,heuristic",  # Only these 2 fields
+        },
+    )
+    data = result.data
+    # Should have ONLY the requested fields, projected from the full result
+    assert data == {key: numpy_mapping[key] for key in ("best_package", "heuristic")}
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import pytest
+
+from conda_meta_mcp.tools._keys import parse_keys
+
+
+@pytest.mark.parametrize(
+    ("get_keys", "expected"),
+    [
+        ("", frozenset()),
+        (None, frozenset()),
+        (" , ,", frozenset()),
+        ("version, build ,url,version", frozenset({"version", "build", "url"})),
+    ],
+)
+def test_parse_keys(get_keys, expected):
+    assert parse_keys(get_keys) == expected
@@ -1,182 +1,351 @@
+import asyncio
 from unittest.mock import patch
 
 import pytest
-from fastmcp import Client
 from fastmcp.exceptions import ToolError
 
+ZSTD_URL = "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda"
 
-@pytest.mark.asyncio
-async def test_info__package_insights__correct_schema(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_insights",
-            {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda"
-            },
-        )
-        assert sorted(result.data.keys()) == [
-            "info/about.json",
-            "info/recipe/meta.yaml",
-            "info/run_exports.json",
-        ]
 
+def _check_some_files(data: dict) -> None:
+    assert sorted(data.keys()) == [
+        "info/about.json",
+        "info/recipe/meta.yaml",
+        "info/run_exports.json",
+    ]
 
-@pytest.mark.asyncio
-async def test_info__package_insights__all(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_insights",
-            {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                "file": "all",
-            },
-        )
-        keys = result.data.keys()
-        assert "info/recipe/meta.yaml" in keys
-        assert len(keys) > 3  # more than the SOME_FILES subset
 
+def _check_all_files(data: dict) -> None:
+    assert "info/recipe/meta.yaml" in data
+    assert len(data) > 3  # more than the SOME_FILES subset
+
+
+def _check_list_without_content(data: dict) -> None:
+    _check_some_files(data)
+    assert all(v.isdigit() for v in data.values()), data
 
-@pytest.mark.asyncio
-async def test_info__package_insights__list_without_content(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_insights",
-            {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                "file": "list-without-content",
-            },
-        )
-        assert sorted(result.data.keys()) == [
-            "info/about.json",
-            "info/recipe/meta.yaml",
-            "info/run_exports.json",
-        ]
-        assert all(v.isdigit() for v in result.data.values()), result
 
+def _check_single_file(data: dict) -> None:
+    assert list(data.keys()) == ["info/recipe/meta.yaml"]
+    assert data["info/recipe/meta.yaml"].strip() != ""
 
+
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_info__package_insights__single_file(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_insights",
-            {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                "file": "info/recipe/meta.yaml",
-            },
-        )
-        assert list(result.data.keys()) == ["info/recipe/meta.yaml"]
-        assert result.data["info/recipe/meta.yaml"].strip() != ""
+@pytest.mark.parametrize(
+    "file, check",
+    [
+        (None, _check_some_files),
+        ("all", _check_all_files),
+        ("list-without-content", _check_list_without_content),
+        ("info/recipe/meta.yaml", _check_single_file),
+    ],
+    ids=["correct_schema", "all", "list_without_content", "single_file"],
+)
+async def test_info__package_insights__file_selection(client, file, check):
+    arguments = {"url": ZSTD_URL}
+    if file is not None:
+        arguments["file"] = file
+    result = await client.call_tool("package_insights", arguments)
+    check(result.data)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_info__package_insights__single_file_paging(server):
-    async with Client(server) as client:
-        # Get full content
-        full = await client.call_tool(
+async def test_info__package_insights__single_file_paging(client):
+    # Get full content and a paged slice of it (line-level paging)
+    full, paged = await asyncio.gather(
+        client.call_tool(
             "package_insights",
             {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
+                "url": ZSTD_URL,
                 "file": "info/recipe/meta.yaml",
             },
-        )
-        full_lines = full.data["info/recipe/meta.yaml"].splitlines()
-        assert len(full_lines) > 10  # ensure enough lines to page
-
-        # Get a paged slice of the content (line-level paging)
-        paged = await client.call_tool(
+        ),
+        client.call_tool(
             "package_insights",
             {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
+                "url": ZSTD_URL,
                 "file": "info/recipe/meta.yaml",
                 "limit": 5,
                 "offset": 2,
             },
-        )
-        paged_lines = paged.data["info/recipe/meta.yaml"].splitlines()
-        assert paged_lines == full_lines[2 : 2 + 5]
+        ),
+    )
+    full_lines = full.data["info/recipe/meta.yaml"].splitlines()
+    assert len(full_lines) > 10  # ensure enough lines to page
 
+    paged_lines = paged.data["info/recipe/meta.yaml"].splitlines()
+    assert paged_lines == full_lines[2 : 2 + 5]
 
+
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_info__package_insights__get_keys_extracts_json_fields(server):
+async def test_info__package_insights__get_keys_extracts_json_fields(client):
     """get_keys parameter should extract specific fields from JSON files."""
-    async with Client(server) as client:
-        # Get full about.json
-        full_result = await client.call_tool(
-            "package_insights",
-            {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                "file": "info/about.json",
-            },
-        )
-        full_content = full_result.data["info/about.json"]
-        full_size = len(full_content)
+    # Get full about.json
+    full_result = await client.call_tool(
+        "package_insights",
+        {
+            "url": ZSTD_URL,
+            "file": "info/about.json",
+        },
+    )
+    full_content = full_result.data["info/about.json"]
+    full_size = len(full_content)
 
-        # Get only specific keys
-        filtered_result = await client.call_tool(
-            "package_insights",
-            {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                "file": "info/about.json",
-                "get_keys": "channels,conda_build_version",
-            },
-        )
-        filtered_content = str(filtered_result.data["info/about.json"])
-        filtered_size = len(filtered_content)
+    # Get only specific keys
+    filtered_result = await client.call_tool(
+        "package_insights",
+        {
+            "url": ZSTD_URL,
+            "file": "info/about.json",
+            "get_keys": "channels,conda_build_version",
+        },
+    )
+    filtered_content = str(filtered_result.data["info/about.json"])
+    filtered_size = len(filtered_content)
 
-        # Filtered result should be smaller
-        assert filtered_size < full_size
-        # Filtered result should be a dict with only requested keys
-        assert isinstance(filtered_result.data["info/about.json"], dict)
-        assert "channels" in filtered_result.data["info/about.json"]
-        assert "conda_build_version" in filtered_result.data["info/about.json"]
+    # Filtered result should be smaller
+    assert filtered_size < full_size
+    # Filtered result should be a dict with only requested keys
+    assert isinstance(filtered_result.data["info/about.json"], dict)
+    assert "channels" in filtered_result.data["info/about.json"]
+    assert "conda_build_version" in filtered_result.data["info/about.json"]
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_info__package_insights__get_keys_requires_single_file(server):
+async def test_info__package_insights__get_keys_requires_single_file(client):
     """get_keys requires exactly one file to be selected."""
-    async with Client(server) as client:
-        with pytest.raises(ToolError) as exc_info:
-            await client.call_tool(
-                "package_insights",
-                {
-                    "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                    "file": "some",  # This selects 3 files
-                    "get_keys": "channels",
-                },
-            )
-        assert "exactly one file" in str(exc_info.value).lower()
-
-
-@pytest.mark.asyncio
-async def test_info__package_insights__get_keys_empty_returns_full_content(server):
-    """Empty get_keys should return full file content (backward compatible)."""
-    async with Client(server) as client:
-        result = await client.call_tool(
+    with pytest.raises(ToolError) as exc_info:
+        await client.call_tool(
             "package_insights",
             {
-                "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda",
-                "file": "info/about.json",
-                "get_keys": "",  # Empty = no filtering
+                "url": ZSTD_URL,
+                "file": "some",  # This selects 3 files
+                "get_keys": "channels",
             },
         )
-        # Should return full string (not parsed)
-        assert isinstance(result.data["info/about.json"], str)
-        # Should contain valid JSON content
-        import json
+    assert "exactly one file" in str(exc_info.value).lower()
+
+
+@pytest.mark.network
+@pytest.mark.asyncio
+async def test_info__package_insights__get_keys_empty_returns_full_content(client):
+    """Empty get_keys should return full file content (backward compatible)."""
+    result = await client.call_tool(
+        "package_insights",
+        {
+            "url": ZSTD_URL,
+            "file": "info/about.json",
+            "get_keys": "",  # Empty = no filtering
+        },
+    )
+    # Should return full string (not parsed)
+    assert isinstance(result.data["info/about.json"], str)
+    # Should contain valid JSON content
+    import json
 
-        parsed = json.loads(result.data["info/about.json"])
-        assert "channels" in parsed
+    parsed = json.loads(result.data["info/about.json"])
+    assert "channels" in parsed
 
 
 @pytest.mark.asyncio
 @patch("conda_meta_mcp.tools.pkg_insights._package_insights", side_effect=Exception("MOCKED"))
-async def test_info__package_insights__error__handled(mock_pkg_insights, server):
+async def test_info__package_insights__error__handled(mock_pkg_insights, client):
     with pytest.raises(ToolError):
-        async with Client(server) as client:
-            await client.call_tool(
-                "package_insights",
-                {
-                    "url": "https://conda.anaconda.org/conda-forge/osx-arm64/zstd-1.5.7-h6491c7d_2.conda"
-                },
-            )
+        await client.call_tool(
+            "package_insights",
+            {"url": ZSTD_URL},
+        )
     mock_pkg_insights.assert_called_once()
+
+
+def test_package_insights__read_all__uses_shared_session():
+    from conda_meta_mcp.tools import pkg_insights
+
+    url = "https://conda.anaconda.org/conda-forge/noarch/example-1.0-0.conda"
+    with patch.object(pkg_insights, "stream_conda_info", return_value=iter(())) as mock_stream:
+        assert pkg_insights._read_all.__wrapped__(url) == {}
+
+    session = mock_stream.call_args.kwargs["session"]
+    assert session is pkg_insights._get_session()
+    assert session.get_adapter(url)._pool_maxsize == pkg_insights.MAX_WORKERS
+
+
+def test_package_insights__read_all__loaded_from_disk_cache():
+    from conda_meta_mcp.tools import pkg_insights
+
+    url = "https://conda.anaconda.org/conda-forge/noarch/cached-1.0-0.conda"
+    pkg_insights._INFO_DISK_CACHE.set(url, {"info/about.json": "{}"})
+
+    with patch.object(pkg_insights, "stream_conda_info", side_effect=AssertionError("cached")):
+        assert pkg_insights._read_all.__wrapped__(url) == {"info/about.json": "{}"}
+
+
+def test_package_insights__extract_keys_from_file__json_and_yaml():
+    from conda_meta_mcp.tools import pkg_insights
+
+    about = '{"channels": ["conda-forge"], "license": "BSD-3-Clause"}'
+    meta = "package:\n  name: zstd\nbuild:\n  number: 2\n"
+
+    assert pkg_insights._extract_keys_from_file(about, "info/about.json", "license") == {
+        "license": "BSD-3-Clause"
+    }
+    assert pkg_insights._extract_keys_from_file(meta, "info/recipe/meta.yaml", "build") == {
+        "build": {"number": 2}
+    }
+    with pytest.raises(ToolError, match="as JSON"):
+        pkg_insights._extract_keys_from_file("{broken", "info/about.json", "license")
+
+
+def test_package_insights__get_keys__parses_cached_file_once():
+    from conda_meta_mcp.tools import pkg_insights
+
+    url = "https://conda.anaconda.org/conda-forge/noarch/keys-1.0-0.conda"
+    data = {"info/about.json": '{"channels": ["conda-forge"], "license": "MIT"}'}
+    pkg_insights._extracted_keys.cache_clear()
+
+    with (
+        patch.object(pkg_insights, "_read_one", return_value=data),
+        patch.object(
+            pkg_insights, "_parse_file_content", wraps=pkg_insights._parse_file_content
+        ) as mock_parse,
+    ):
+        results = [
+            pkg_insights._package_insights(url, "info/about.json", get_keys="license")
+            for _ in range(2)
+        ]
+
+    assert results == [{"info/about.json": {"license": "MIT"}}] * 2
+    mock_parse.assert_called_once()
+    # every caller gets its own copy of the memoized result
+    results[0]["info/about.json"]["license"] = "changed"
+    assert pkg_insights._package_insights(url, "info/about.json", get_keys="license") == {
+        "info/about.json": {"license": "MIT"}
+    }
+    pkg_insights._extracted_keys.cache_clear()
+
+
+def test_package_insights__some__reads_only_needed_members():
+    import io
+    from types import SimpleNamespace
+
+    from conda_meta_mcp.tools import pkg_insights
+
+    url = "https://conda.anaconda.org/conda-forge/noarch/partial-1.0-0.conda"
+    names = ["info/index.json", *sorted(pkg_insights.SOME_FILES), "info/paths.json"]
+    extracted = []
+
+    class _Tar:
+        def extractfile(self, member):
+            extracted.append(member.name)
+            return io.BytesIO(b"a\nb\n")
+
+    def _stream(_url, session):
+        for name in names:
+            yield _Tar(), SimpleNamespace(name=name)
+        raise AssertionError("stream should be closed once all files were found")
+
+    with patch.object(pkg_insights, "stream_conda_info", side_effect=_stream):
+        listing = pkg_insights._package_insights(url, file="list-without-content")
+
+    assert listing == dict.fromkeys(pkg_insights.SOME_FILES, "2")
+    assert sorted(extracted) == sorted(pkg_insights.SOME_FILES)
+
+
+def test_package_insights__single_file__stops_at_member():
+    import io
+    from types import SimpleNamespace
+
+    from conda_meta_mcp.tools import pkg_insights
+
+    url = "https://conda.anaconda.org/conda-forge/noarch/single-1.0-0.conda"
+    names = ["info/index.json", "info/recipe/meta.yaml", "info/paths.json"]
+    extracted = []
+
+    class _Tar:
+        def extractfile(self, member):
+            extracted.append(member.name)
+            return io.BytesIO(b"package: {}\n")
+
+    def _stream(_url, session):
+        for name in names:
+            yield _Tar(), SimpleNamespace(name=name)
+        raise AssertionError("stream should be closed once the file was found")
+
+    def _empty_stream(_url, session):
+        yield from ()
+
+    with patch.object(pkg_insights, "stream_conda_info", side_effect=_stream):
+        data = pkg_insights._package_insights(url, file="info/recipe/meta.yaml")
+
+    assert data == {"info/recipe/meta.yaml": "package: {}\n"}
+    assert extracted == ["info/recipe/meta.yaml"]
+
+    # a missing member is cached as well, so asking again does not stream again
+    with patch.object(pkg_insights, "stream_conda_info", side_effect=_empty_stream) as stream:
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                pkg_insights._package_insights(url, file="info/missing.json")
+    assert stream.call_count == 1
+
+
+def test_package_insights__paging__slices_cached_lines():
+    from conda_meta_mcp.tools import pkg_insights
+
+    content = "".join(f"line {i}\r\n" for i in range(10))
+    url = "https://conda.anaconda.org/conda-forge/noarch/paged-1.0-0.conda"
+    data = {"info/recipe/meta.yaml": content}
+
+    with patch.object(pkg_insights, "_read_one", return_value=data):
+        pages = [
+            pkg_insights._package_insights(url, "info/recipe/meta.yaml", limit=4, offset=offset)
+            for offset in (0, 4, 8)
+        ]
+
+    assert [page["info/recipe/meta.yaml"] for page in pages] == [
+        "\n".join(content.splitlines()[offset : offset + 4]) for offset in (0, 4, 8)
+    ]
+    assert pkg_insights._lines.cache_peek(content) is not None
+    assert pkg_insights._line_count(content) == len(content.splitlines()) == 10
+    assert pkg_insights._line_count(content + "tail") == 11
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["", "a", "a\n", "a\r\nb", "a\rb\rc", "a\n\x0cb\x1cc", "a\n\n", "a\u2028b\r", "\r\n\r"],
+)
+def test_package_insights__line_count__matches_splitlines(content):
+    from conda_meta_mcp.tools import pkg_insights
+
+    assert pkg_insights._line_count(content) == len(content.splitlines())
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "package:\n  name: zstd\nrequirements:\n  host: [xz, lz4]\nabout: {license: BSD}\n",
+        "base: &anchor {x: 1}\nrequirements: *anchor\nabout: 2\n",
+        "'about': quoted\ntrue: bool-key\nrequirements: null\n",
+        "base: &base {about: merged}\n<<: *base\nrequirements: 1\n",
+        "!!str about: tagged\n!!int 2: two\nrequirements: 1\n",
+        "- about\n- requirements\n",
+        "",
+    ],
+)
+def test_package_insights__yaml_subset__matches_full_load(content):
+    import yaml
+
+    from conda_meta_mcp.tools import pkg_insights
+
+    keys = {"requirements", "about", "true"}
+    full = yaml.safe_load(content)
+    if isinstance(full, dict):
+        full = {k: v for k, v in full.items() if k in keys}
+
+    subset = pkg_insights._extract_keys_from_dict(
+        pkg_insights._load_yaml_subset(content, keys), ",".join(keys)
+    )
+    assert subset == full
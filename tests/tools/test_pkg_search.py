@@ -1,287 +1,518 @@
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from itertools import pairwise
-from unittest.mock import patch
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+from unittest.mock import PropertyMock, patch
 
 import pytest
 from conda.models.version import VersionOrder
-from fastmcp import Client
 from fastmcp.exceptions import ToolError
 
+from conda_meta_mcp.tools import pkg_search
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
 
 def _is_sorted_newest_first(records: list[dict]) -> bool:
     """
     Validate that records are ordered newest-first by (version, build_number) according to
     conda's VersionOrder, then numeric build_number.
     """
+    # Build each key once; comparing pairs would otherwise parse every version twice
+    keys = [(VersionOrder(r["version"]), int(r["build_number"])) for r in records]
+    return all(prev >= curr for prev, curr in pairwise(keys))
+
+
+def _record(
+    name: str, version: str, build_number: int = 0, variant: str = "", location: str = ""
+) -> SimpleNamespace:
+    """A stand-in for the package records a SubdirData query yields."""
+    build = f"h{build_number}{variant}"
+    return SimpleNamespace(
+        version=version,
+        build_number=build_number,
+        build=build,
+        url=f"https://example.invalid/{location}{name}-{version}-{build}.conda",
+        depends=(),
+    )
+
+
+def _patch_subdirs(query: Callable[[str, str, str], Iterable[Any]]) -> Any:
+    """Patch _get_subdirs with one fake subdir per channel/platform.
+
+    query(channel, platform, spec) returns the records that subdir yields for spec.
+    """
 
-    def key(r):
-        version = VersionOrder(r["version"])
-        bn = int(r["build_number"])
-        return (version, bn)
+    def _subdirs(channel: str, platform: str) -> tuple[SimpleNamespace, ...]:
+        return (SimpleNamespace(query=lambda spec: iter(query(channel, platform, spec))),)
 
-    return all(key(prev) >= key(curr) for prev, curr in pairwise(records))
+    return patch.object(pkg_search, "_get_subdirs", side_effect=_subdirs)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_pkg_search__basic_schema(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "zstd",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-            },
-        )
-        data = result.data
-        assert isinstance(data, dict)
-        assert "results" in data
-        assert "total" in data
-        assert "limit" in data
-        assert "offset" in data
-
-        results = data["results"]
-        assert isinstance(results, list)
-        assert len(results) > 0
-        required_keys = {"version", "build_number", "build", "url", "depends"}
-        for entry in results[:5]:  # sample a few to keep test lighter
-            assert required_keys.issubset(entry.keys())
-        assert _is_sorted_newest_first(results)
+async def test_pkg_search__basic_schema(client):
+    result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+        },
+    )
+    data = result.data
+    assert isinstance(data, dict)
+    assert "results" in data
+    assert "total" in data
+    assert "limit" in data
+    assert "offset" in data
+
+    results = data["results"]
+    assert isinstance(results, list)
+    assert len(results) > 0
+    required_keys = {"version", "build_number", "build", "url", "depends"}
+    for entry in results[:5]:  # sample a few to keep test lighter
+        assert required_keys.issubset(entry.keys())
+    assert _is_sorted_newest_first(results)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_pkg_search__version_filter(server):
-    async with Client(server) as client:
-        # Use a specific version constraint that should exist.
-        version_spec = "1.5.7"
-        result = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": f"zstd={version_spec}",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-            },
-        )
-        data = result.data
-        results = data["results"]
-        assert len(results) > 0
-        assert all(entry["version"] == version_spec for entry in results)
+async def test_pkg_search__version_filter(client):
+    # Use a specific version constraint that should exist.
+    version_spec = "1.5.7"
+    result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": f"zstd={version_spec}",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+        },
+    )
+    data = result.data
+    results = data["results"]
+    assert len(results) > 0
+    assert all(entry["version"] == version_spec for entry in results)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_pkg_search__paging(server):
-    async with Client(server) as client:
-        # Get a baseline list (capped to avoid huge pulls).
-        baseline_limit = 12
-        baseline = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "zstd",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": baseline_limit,
-            },
-        )
-        base_list = baseline.data["results"]
-        # Need enough records for paging validation.
-        assert len(base_list) >= 6
+async def test_pkg_search__paging(client):
+    # Get a baseline list (capped to avoid huge pulls).
+    baseline_limit = 12
+    baseline = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": baseline_limit,
+        },
+    )
+    base_list = baseline.data["results"]
+    # Need enough records for paging validation.
+    assert len(base_list) >= 6
 
-        # Page 1 (first 3)
-        page1 = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "zstd",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 3,
-                "offset": 0,
-            },
-        )
-        # Page 2 (next 3)
-        page2 = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "zstd",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 3,
-                "offset": 3,
-            },
-        )
-        # Page 3 (next 3)
-        page3 = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "zstd",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 3,
-                "offset": 6,
-            },
-        )
+    # Page 1 (first 3)
+    page1 = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 3,
+            "offset": 0,
+        },
+    )
+    # Page 2 (next 3)
+    page2 = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 3,
+            "offset": 3,
+        },
+    )
+    # Page 3 (next 3)
+    page3 = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 3,
+            "offset": 6,
+        },
+    )
 
-        p1 = page1.data["results"]
-        p2 = page2.data["results"]
-        p3 = page3.data["results"]
+    p1 = page1.data["results"]
+    p2 = page2.data["results"]
+    p3 = page3.data["results"]
 
-        assert p1 == base_list[0:3]
-        assert p2 == base_list[3:6]
-        assert p3 == base_list[6:9]
+    assert p1 == base_list[0:3]
+    assert p2 == base_list[3:6]
+    assert p3 == base_list[6:9]
 
-        # Ensure no overlap between consecutive pages
-        assert not set(tuple(r.items()) for r in p1).intersection(
-            set(tuple(r.items()) for r in p2)
-        )
-        assert not set(tuple(r.items()) for r in p2).intersection(
-            set(tuple(r.items()) for r in p3)
-        )
+    # Ensure no overlap between consecutive pages (the url identifies a record)
+    assert not {r["url"] for r in p1} & {r["url"] for r in p2}
+    assert not {r["url"] for r in p2} & {r["url"] for r in p3}
 
-        # limit=1 should return the newest record (same as baseline[0])
-        newest = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "zstd",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 1,
-            },
-        )
-        assert newest.data["results"][0] == base_list[0]
+    # limit=1 should return the newest record (same as baseline[0])
+    newest = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 1,
+        },
+    )
+    assert newest.data["results"][0] == base_list[0]
 
-        # Offset beyond available -> empty
-        far_offset = await client.call_tool(
+    # Offset beyond available -> empty
+    far_offset = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "zstd",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 5,
+            "offset": 10_000,
+        },
+    )
+    assert far_offset.data["results"] == []
+
+
+@pytest.mark.asyncio
+@patch("conda_meta_mcp.tools.pkg_search._package_search", side_effect=Exception("MOCKED"))
+async def test_pkg_search__error__handled(mock_pkg_search, client):
+    with pytest.raises(ToolError):
+        await client.call_tool(
             "package_search",
             {
                 "package_ref_or_match_spec": "zstd",
                 "channel": "conda-forge",
                 "platform": "osx-arm64",
-                "limit": 5,
-                "offset": 10_000,
             },
         )
-        assert far_offset.data["results"] == []
-
-
-@pytest.mark.asyncio
-@patch("conda_meta_mcp.tools.pkg_search._package_search", side_effect=Exception("MOCKED"))
-async def test_pkg_search__error__handled(mock_pkg_search, server):
-    with pytest.raises(ToolError):
-        async with Client(server) as client:
-            await client.call_tool(
-                "package_search",
-                {
-                    "package_ref_or_match_spec": "zstd",
-                    "channel": "conda-forge",
-                    "platform": "osx-arm64",
-                },
-            )
     mock_pkg_search.assert_called_once()
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_pkg_search__get_keys_empty_returns_all(server):
+async def test_pkg_search__get_keys_empty_returns_all(client):
     """Empty get_keys should return all fields (backward compatible)."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "numpy",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 1,
-                "get_keys": "",  # Empty = all fields
-            },
-        )
-        data = result.data
-        assert "results" in data
-        results = data["results"]
-        assert len(results) == 1
-        record = results[0]
-        # Should have all 5 fields from PackageRecord
-        expected_keys = {"version", "build_number", "build", "url", "depends"}
-        assert expected_keys.issubset(record.keys())
+    result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "numpy",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 1,
+            "get_keys": "",  # Empty = all fields
+        },
+    )
+    data = result.data
+    assert "results" in data
+    results = data["results"]
+    assert len(results) == 1
+    record = results[0]
+    # Should have all 5 fields from PackageRecord
+    expected_keys = {"version", "build_number", "build", "url", "depends"}
+    assert expected_keys.issubset(record.keys())
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_pkg_search__get_keys_filters_fields(server):
+async def test_pkg_search__get_keys_filters_fields(client):
     """get_keys parameter should filter result to only requested fields."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "numpy",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 1,
-                "get_keys": "version,url",  # Only these 2 fields
-            },
-        )
-        data = result.data
-        assert "results" in data
-        results = data["results"]
-        assert len(results) == 1
-        record = results[0]
-        # Should have ONLY the requested fields
-        assert set(record.keys()) == {"version", "url"}
-        assert "build" not in record
-        assert "build_number" not in record
-        assert "depends" not in record
+    result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "numpy",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 1,
+            "get_keys": "version,url",  # Only these 2 fields
+        },
+    )
+    data = result.data
+    assert "results" in data
+    results = data["results"]
+    assert len(results) == 1
+    record = results[0]
+    # Should have ONLY the requested fields
+    assert set(record.keys()) == {"version", "url"}
+    assert "build" not in record
+    assert "build_number" not in record
+    assert "depends" not in record
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_pkg_search__get_keys_context_reduction(server):
+async def test_pkg_search__get_keys_context_reduction(client):
     """get_keys should reduce result size significantly."""
-    async with Client(server) as client:
-        # Get full result
-        full_result = await client.call_tool(
-            "package_search",
-            {
-                "package_ref_or_match_spec": "numpy",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 5,
-                "get_keys": "",
-            },
+    # Get full result
+    full_result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "numpy",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 5,
+            "get_keys": "",
+        },
+    )
+    full_size = len(str(full_result.data["results"]))
+
+    # Get filtered result
+    filtered_result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "numpy",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 5,
+            "get_keys": "version,url",
+        },
+    )
+    filtered_size = len(str(filtered_result.data["results"]))
+
+    # Filtered should be significantly smaller
+    reduction = (full_size - filtered_size) / full_size
+    assert reduction > 0.5  # At least 50% reduction
+
+
+@pytest.mark.network
+@pytest.mark.asyncio
+async def test_pkg_search__backward_compat_no_get_keys_param(client):
+    """Old calls without get_keys should still work."""
+    result = await client.call_tool(
+        "package_search",
+        {
+            "package_ref_or_match_spec": "numpy",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 1,
+            # No get_keys parameter
+        },
+    )
+    data = result.data
+    assert "results" in data
+    results = data["results"]
+    assert len(results) == 1
+    # Should return all fields by default
+    expected_keys = {"version", "build_number", "build", "url", "depends"}
+    assert expected_keys.issubset(results[0].keys())
+
+
+def test_pkg_search__full_search__loaded_from_disk_cache():
+    record = {
+        "version": "2.0.0",
+        "build_number": "1",
+        "build": "py313_1",
+        "url": "https://conda.anaconda.org/conda-forge/linux-64/example-2.0.0-py313_1.conda",
+        "depends": "['python']",
+    }
+    key = '["example", "conda-forge", "linux-64"]'
+    pkg_search._SEARCH_DISK_CACHE.set(key, [record])
+
+    with patch.object(pkg_search, "_get_subdirs", side_effect=AssertionError("not cached")):
+        results = pkg_search._full_package_search.__wrapped__("example", "conda-forge", "linux-64")
+
+    assert results == ([pkg_search.PackageRecord(**record)], 1)
+
+
+def test_pkg_search__full_search__cleared_by_cache_maintenance():
+    from conda_meta_mcp.tools.cache_utils import clear_external_library_caches
+
+    with _patch_subdirs(lambda channel, platform, spec: [_record("cleared", "1.0")]):
+        pkg_search._full_package_search("cleared-example", "conda-forge", "linux-64", 1)
+    assert pkg_search._full_package_search.cache_info().currsize >= 1
+
+    clear_external_library_caches()
+    assert pkg_search._full_package_search.cache_info().currsize == 0
+
+
+def test_pkg_search__limit__selects_newest_without_full_sort():
+    matches = [
+        _record("heap", version, build_number)
+        for version, build_number in [("1.2", 0), ("1.10", 1), ("1.10", 0), ("1.9", 3)]
+    ]
+
+    queries = []
+    with _patch_subdirs(lambda channel, platform, spec: queries.append(spec) or matches):
+        page = pkg_search._package_search("heap-example", "conda-forge", "linux-64", 1, 1)
+        full = pkg_search._package_search("heap-example", "conda-forge", "linux-64", 0, 0)
+
+    # Both page sizes are selected from one subdir query
+    assert queries == ["heap-example"]
+    assert page["total"] == full["total"] == 4
+    assert page["limit"] == 1
+    assert page["results"] == full["results"][1:2]
+    assert [(r["version"], r["build_number"]) for r in full["results"]] == [
+        ("1.10", "1"),
+        ("1.10", "0"),
+        ("1.9", "3"),
+        ("1.2", "0"),
+    ]
+
+
+def test_pkg_search__get_subdirs__resolved_once_and_cleared():
+    pkg_search._clear_conda_subdirdata_cache_for_pkg_search()
+    subdirs = pkg_search._get_subdirs("conda-forge", "linux-64")
+
+    # Same subdirs SubdirData.query_all would search (platform plus noarch)
+    assert [s.channel.subdir for s in subdirs] == ["linux-64", "noarch"]
+    # later calls go through SubdirData's own instance cache
+    again = pkg_search._get_subdirs("conda-forge", "linux-64")
+    assert all(a is b for a, b in zip(again, subdirs, strict=True))
+
+    pkg_search._clear_conda_subdirdata_cache_for_pkg_search()
+    assert ("conda-forge", "linux-64") not in pkg_search._SUBDIR_URLS
+
+
+def test_pkg_search__get_subdirs__denied_channel_raises():
+    from conda.base.context import context
+    from conda.exceptions import ChannelDenied
+
+    with (
+        patch.object(
+            type(context),
+            "denylist_channels",
+            new_callable=PropertyMock,
+            return_value=("denied-example",),
+        ),
+        pytest.raises(ChannelDenied),
+    ):
+        pkg_search._get_subdirs("denied-example", "linux-64")
+
+    assert ("denied-example", "linux-64") not in pkg_search._SUBDIR_URLS
+
+
+def test_pkg_search__cursor__continues_after_last_record():
+    matches = [
+        _record("cursor", version, build_number, variant)
+        for version, build_number, variant in [
+            ("2.0", 0, "a"),
+            ("2.0", 0, "b"),
+            ("1.0", 1, ""),
+            ("3.0", 0, ""),
+            ("1.0", 0, ""),
+        ]
+    ]
+
+    with _patch_subdirs(lambda channel, platform, spec: matches):
+        full = pkg_search._package_search("cursor-example", "conda-forge", "linux-64", 0, 0)
+        pages = [pkg_search._package_search("cursor-example", "conda-forge", "linux-64", 2, 0)]
+        while "next_cursor" in pages[-1]:
+            pages.append(
+                pkg_search._package_search(
+                    "cursor-example",
+                    "conda-forge",
+                    "linux-64",
+                    2,
+                    0,
+                    cursor=pages[-1]["next_cursor"],
+                )
+            )
+
+    assert [page["offset"] for page in pages] == [0, 2, 4]
+    assert [r for page in pages for r in page["results"]] == full["results"]
+    assert "next_cursor" not in full
+
+    with pytest.raises(ValueError, match="invalid cursor"):
+        pkg_search._package_search(
+            "cursor-example", "conda-forge", "linux-64", 2, 0, cursor="not-a-cursor"
         )
-        full_size = len(str(full_result.data["results"]))
 
-        # Get filtered result
-        filtered_result = await client.call_tool(
+
+@pytest.mark.asyncio
+async def test_pkg_search__multiple_channels_and_platforms__merged(client):
+    def _query(channel, platform, spec):
+        return [
+            _record("merge", "1.0", location=f"{channel}/{platform}/"),
+            _record("merge", "2.0", location=f"{channel}/noarch/"),
+        ]
+
+    with _patch_subdirs(_query):
+        result = await client.call_tool(
             "package_search",
             {
-                "package_ref_or_match_spec": "numpy",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 5,
-                "get_keys": "version,url",
+                "package_ref_or_match_spec": "merge-example",
+                "channel": "chan-a, chan-b",
+                "platform": "linux-64,osx-64",
+                "get_keys": "url",
             },
         )
-        filtered_size = len(str(filtered_result.data["results"]))
 
-        # Filtered should be significantly smaller
-        reduction = (full_size - filtered_size) / full_size
-        assert reduction > 0.5  # At least 50% reduction
+    urls = [r["url"].removeprefix("https://example.invalid/") for r in result.data["results"]]
+    # noarch records are found once per platform but returned once
+    assert sorted(urls[:2]) == [
+        "chan-a/noarch/merge-2.0-h0.conda",
+        "chan-b/noarch/merge-2.0-h0.conda",
+    ]
+    assert sorted(urls[2:]) == [
+        "chan-a/linux-64/merge-1.0-h0.conda",
+        "chan-a/osx-64/merge-1.0-h0.conda",
+        "chan-b/linux-64/merge-1.0-h0.conda",
+        "chan-b/osx-64/merge-1.0-h0.conda",
+    ]
+    assert result.data["total"] == 6
 
 
 @pytest.mark.asyncio
-async def test_pkg_search__backward_compat_no_get_keys_param(server):
-    """Old calls without get_keys should still work."""
-    async with Client(server) as client:
+async def test_pkg_search__channel_and_platform__normalized(client):
+    searched = []
+
+    with _patch_subdirs(
+        lambda channel, platform, spec: searched.append((channel, platform)) or ()
+    ):
         result = await client.call_tool(
             "package_search",
             {
-                "package_ref_or_match_spec": "numpy",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 1,
-                # No get_keys parameter
+                "package_ref_or_match_spec": "normalized-example",
+                "channel": " chan-a , ",
+                "platform": "linux-64,linux-64",
             },
         )
-        data = result.data
-        assert "results" in data
-        results = data["results"]
-        assert len(results) == 1
-        # Should return all fields by default
-        expected_keys = {"version", "build_number", "build", "url", "depends"}
-        assert expected_keys.issubset(results[0].keys())
+        with pytest.raises(ToolError, match="validation_error"):
+            await client.call_tool(
+                "package_search",
+                {
+                    "package_ref_or_match_spec": "normalized-example",
+                    "channel": ",",
+                    "platform": "linux-64",
+                },
+            )
+
+    assert searched == [("chan-a", "linux-64")]
+    assert result.data["total"] == 0
+
+
+def test_pkg_search__unique_records__serialized_per_channel_platform():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def _query(channel, platform, spec):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return ()
+
+    with _patch_subdirs(_query), ThreadPoolExecutor(3) as pool:
+        specs = [f"serialized-{i}" for i in range(3)]
+        list(pool.map(pkg_search._unique_records, specs, ["c"] * 3, ["linux-64"] * 3))
+
+    assert peak == 1
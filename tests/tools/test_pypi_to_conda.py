@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 import pytest
-from fastmcp import Client
 from fastmcp.exceptions import ToolError
 
 from conda_meta_mcp.tools import pypi_to_conda as pypi_to_conda_module
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "pypi_name,expected_conda,expected_changed",
@@ -17,7 +17,7 @@ from conda_meta_mcp.tools import pypi_to_conda as pypi_to_conda_module
     ],
 )
 async def test_pypi_to_conda__success_parametrized(
-    server, pypi_name, expected_conda, expected_changed
+    client, pypi_name, expected_conda, expected_changed
 ):
     """
     Parametrized happy-path test for the pypi_to_conda tool.
@@ -27,30 +27,28 @@ async def test_pypi_to_conda__success_parametrized(
       * Returned mapping matches expected (for well-known packages).
       * `changed` flag matches the tool's definition (conda_name != pypi_name.lower()).
     """
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "pypi_to_conda", {"pypi_name": pypi_name, "channel": "conda-forge"}
-        )
-        data = result.data
+    result = await client.call_tool(
+        "pypi_to_conda", {"pypi_name": pypi_name, "channel": "conda-forge"}
+    )
+    data = result.data
 
-        assert sorted(data.keys()) == ["changed", "conda_name", "pypi_name"]
+    assert sorted(data.keys()) == ["changed", "conda_name", "pypi_name"]
 
-        assert data["pypi_name"] == pypi_name
-        assert data["conda_name"] == expected_conda
-        assert data["changed"] == expected_changed
+    assert data["pypi_name"] == pypi_name
+    assert data["conda_name"] == expected_conda
+    assert data["changed"] == expected_changed
 
-        # Derive expected_changed from logic for extra safety
-        assert data["changed"] == (data["conda_name"] != pypi_name.lower())
+    # Derive expected_changed from logic for extra safety
+    assert data["changed"] == (data["conda_name"] != pypi_name.lower())
 
 
 @pytest.mark.asyncio
-async def test_pypi_to_conda__error_empty_input(server):
+async def test_pypi_to_conda__error_empty_input(client):
     """
     Empty input should raise a ToolError (input validation path).
     """
-    async with Client(server) as client:
-        with pytest.raises(ToolError):
-            await client.call_tool("pypi_to_conda", {"pypi_name": "", "channel": "conda-forge"})
+    with pytest.raises(ToolError):
+        await client.call_tool("pypi_to_conda", {"pypi_name": "", "channel": "conda-forge"})
 
 
 @pytest.mark.asyncio
@@ -77,3 +75,22 @@ async def test_pypi_to_conda__unsupported_channel_before_dependency_missing(monk
     assert "No data available for channel 'defaults'" in message
     assert "Try a different channel" in message
     pypi_to_conda_module._map_pypi_name.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_pypi_to_conda__surrounding_whitespace__shares_cache_entry(monkeypatch):
+    calls = []
+
+    def fake_map(name):
+        calls.append(name)
+        return name.lower()
+
+    pypi_to_conda_module._map_pypi_name.cache_clear()
+    monkeypatch.setattr(pypi_to_conda_module, "map_pypi_to_conda", fake_map)
+
+    first = await pypi_to_conda_module.pypi_to_conda(" PyYAML ", "conda-forge")
+    second = await pypi_to_conda_module.pypi_to_conda("PyYAML", "conda-forge")
+
+    assert first == second == {"pypi_name": "PyYAML", "conda_name": "pyyaml", "changed": False}
+    assert calls == ["PyYAML"]
+    pypi_to_conda_module._map_pypi_name.cache_clear()
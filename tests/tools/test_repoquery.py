@@ -1,257 +1,340 @@
 from __future__ import annotations
 
+import json
+
 import pytest
-from fastmcp import Client
 from fastmcp.exceptions import ToolError
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery_depends_basic(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-            },
-        )
-        payload = result.data
-        assert "query" in payload and "result" in payload
-        q_outer = payload["query"]
-        assert q_outer["subcmd"] == "depends"
-        inner = payload["result"]
-        # Inner should contain its own query/result keys (mirroring raw QueryResult)
-        assert "query" in inner and "result" in inner
-        assert inner["result"]["status"] == "OK"
-        pkgs = inner["result"]["pkgs"]
-        assert isinstance(pkgs, list) and len(pkgs) > 0
-        # Each pkg should have at least a name key
-        assert all("name" in p for p in pkgs)
+async def test_repoquery_depends_basic(client):
+    result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "get_keys": "name",  # only the names are checked
+        },
+    )
+    payload = result.data
+    assert "query" in payload and "result" in payload
+    q_outer = payload["query"]
+    assert q_outer["subcmd"] == "depends"
+    inner = payload["result"]
+    # Inner should contain its own query/result keys (mirroring raw QueryResult)
+    assert "query" in inner and "result" in inner
+    assert inner["result"]["status"] == "OK"
+    pkgs = inner["result"]["pkgs"]
+    assert isinstance(pkgs, list) and len(pkgs) > 0
+    # Each pkg should have at least a name key
+    assert all("name" in p for p in pkgs)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery_whoneeds_basic(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "whoneeds",
-                "spec": "zlib",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-            },
-        )
-        payload = result.data
-        assert payload["query"]["subcmd"] == "whoneeds"
-        inner = payload["result"]
-        assert inner["result"]["status"] == "OK"
-        pkgs = inner["result"]["pkgs"]
-        # Expect at least one reverse dependency for zlib
-        assert len(pkgs) > 0
-        assert all("name" in p for p in pkgs)
+async def test_repoquery_whoneeds_basic(client):
+    result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "whoneeds",
+            "spec": "zlib",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "get_keys": "name",  # only the names are checked
+        },
+    )
+    payload = result.data
+    assert payload["query"]["subcmd"] == "whoneeds"
+    inner = payload["result"]
+    assert inner["result"]["status"] == "OK"
+    pkgs = inner["result"]["pkgs"]
+    # Expect at least one reverse dependency for zlib
+    assert len(pkgs) > 0
+    assert all("name" in p for p in pkgs)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery_depends_tree_mode(server):
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "tree": True,
-            },
-        )
-        payload = result.data
-        assert payload["query"]["tree"] is True
-        inner = payload["result"]
-        assert inner["result"]["status"] == "OK"
-        assert len(inner["result"]["pkgs"]) > 0
+async def test_repoquery_depends_tree_mode(client):
+    result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "tree": True,
+        },
+    )
+    payload = result.data
+    assert payload["query"]["tree"] is True
+    inner = payload["result"]
+    assert inner["result"]["status"] == "OK"
+    assert len(inner["result"]["pkgs"]) > 0
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery_depends_paging(server):
-    async with Client(server) as client:
-        page = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 3,
-                "offset": 0,
-            },
-        )
-        payload = page.data
-        assert payload["query"]["limit"] == 3
-        assert payload["query"]["offset"] == 0
-
-        inner = payload["result"]
+async def test_repoquery_depends_paging(client):
+    page = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "get_keys": "name",  # only the page size is checked
+            "limit": 3,
+            "offset": 0,
+        },
+    )
+    payload = page.data
+    assert payload["query"]["limit"] == 3
+    assert payload["query"]["offset"] == 0
 
-        # The underlying structure may nest pkgs inside inner["result"]["pkgs"],
-        # or (if pagination slicing logic changes) expose a sibling "pkgs".
-        pkgs = inner.get("pkgs") or inner.get("result", {}).get("pkgs")
-        assert pkgs is not None
-        assert isinstance(pkgs, list)
-        assert len(pkgs) > 0
-        # If real slicing is applied len(pkgs) <= limit; if not, allow larger (future-proof)
-        assert len(pkgs) <= 3 or payload["query"]["total"] >= len(pkgs)
+    # The page is sliced server-side, inside the raw QueryResult structure
+    inner = payload["result"]["result"]
+    pkgs = inner["pkgs"]
+    assert isinstance(pkgs, list)
+    assert 0 < len(pkgs) <= 3
+    assert (inner["offset"], inner["limit"]) == (0, 3)
+    assert inner["total"] == payload["query"]["total"] >= len(pkgs)
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery_whoneeds_paging(server):
-    async with Client(server) as client:
-        page = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "whoneeds",
-                "spec": "zlib",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 4,
-                "offset": 0,
-            },
-        )
-        payload = page.data
-        assert payload["query"]["limit"] == 4
-        assert payload["query"]["offset"] == 0
+async def test_repoquery_whoneeds_paging(client):
+    page = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "whoneeds",
+            "spec": "zlib",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "get_keys": "name",  # only the page size is checked
+            "limit": 4,
+            "offset": 0,
+        },
+    )
+    payload = page.data
+    assert payload["query"]["limit"] == 4
+    assert payload["query"]["offset"] == 0
 
-        inner = payload["result"]
-        pkgs = inner.get("pkgs") or inner.get("result", {}).get("pkgs")
-        assert pkgs is not None
-        assert isinstance(pkgs, list)
-        assert len(pkgs) > 0
-        assert len(pkgs) <= 4 or payload["query"]["total"] >= len(pkgs)
+    inner = payload["result"]["result"]
+    pkgs = inner["pkgs"]
+    assert isinstance(pkgs, list)
+    assert 0 < len(pkgs) <= 4
+    assert inner["total"] == payload["query"]["total"] >= len(pkgs)
 
 
 @pytest.mark.asyncio
-async def test_repoquery_error_invalid_subcmd(server):
-    async with Client(server) as client:
-        with pytest.raises(ToolError):
-            await client.call_tool(
-                "repoquery",
-                {
-                    "subcmd": "not-a-real-subcmd",
-                    "spec": "python",
-                    "channel": "conda-forge",
-                    "platform": "osx-arm64",
-                },
-            )
-
-
-@pytest.mark.asyncio
-async def test_repoquery__get_keys_empty_returns_all(server):
-    """Empty get_keys should return all package fields (backward compatible)."""
-    async with Client(server) as client:
-        result = await client.call_tool(
+async def test_repoquery_error_invalid_subcmd(client):
+    with pytest.raises(ToolError):
+        await client.call_tool(
             "repoquery",
             {
-                "subcmd": "depends",
+                "subcmd": "not-a-real-subcmd",
                 "spec": "python",
                 "channel": "conda-forge",
                 "platform": "osx-arm64",
-                "limit": 1,
-                "offset": 0,
-                "get_keys": "",  # Empty = all fields
             },
         )
-        data = result.data
-        # Should have 20+ fields per package
-        inner = data.get("result", {})
-        packages = inner.get("pkgs") or inner.get("result", {}).get("pkgs", [])
-        assert len(packages) > 0
-        first_pkg = packages[0]
-        # Verify we have many fields
-        assert len(first_pkg.keys()) >= 15
 
 
+@pytest.mark.network
+@pytest.mark.asyncio
+async def test_repoquery__get_keys_empty_returns_all(client):
+    """Empty get_keys should return all package fields (backward compatible)."""
+    result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 1,
+            "offset": 0,
+            "get_keys": "",  # Empty = all fields
+        },
+    )
+    data = result.data
+    # Should have 20+ fields per package
+    packages = data["result"]["result"]["pkgs"]
+    assert len(packages) > 0
+    first_pkg = packages[0]
+    # Verify we have many fields
+    assert len(first_pkg.keys()) >= 15
+
+
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery__get_keys_filters_packages(server):
+async def test_repoquery__get_keys_filters_packages(client):
     """get_keys parameter should filter packages to only requested fields."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 2,
-                "offset": 0,
-                "get_keys": "name,version,url",  # Only these 3 fields
-            },
-        )
-        data = result.data
-        inner = data.get("result", {})
-        packages = inner.get("pkgs") or inner.get("result", {}).get("pkgs", [])
+    result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 2,
+            "offset": 0,
+            "get_keys": "name,version,url",  # Only these 3 fields
+        },
+    )
+    data = result.data
+    packages = data["result"]["result"]["pkgs"]
+    assert packages
 
-        # All packages should have ONLY requested fields
-        for pkg in packages:
-            assert set(pkg.keys()) == {"name", "version", "url"}
-            assert "build" not in pkg
-            assert "depends" not in pkg
+    # All packages should have ONLY requested fields
+    expected = {"name", "version", "url"}
+    for pkg in packages:
+        assert pkg.keys() == expected
+        assert "build" not in pkg
+        assert "depends" not in pkg
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery__get_keys_context_reduction(server):
+async def test_repoquery__get_keys_context_reduction(client):
     """get_keys should reduce repoquery result size by 60-80%."""
-    async with Client(server) as client:
-        # Get full result
-        full_result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 5,
-                "offset": 0,
-                "get_keys": "",
-            },
-        )
-        full_size = len(str(full_result.data))
+    # The reduction comes from the per-package projection (whose exact output is checked
+    # in test_repoquery__get_keys_filters_packages), so one unfiltered page is enough
+    full_result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "platform": "osx-arm64",
+            "limit": 5,
+            "offset": 0,
+            "get_keys": "",
+        },
+    )
+    full_pkgs = full_result.data["result"]["result"]["pkgs"]
+    full_size = len(json.dumps(full_pkgs))
+    filtered_size = len(
+        json.dumps([{k: pkg[k] for k in ("name", "version")} for pkg in full_pkgs])
+    )
 
-        # Get filtered result
-        filtered_result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "platform": "osx-arm64",
-                "limit": 5,
-                "offset": 0,
-                "get_keys": "name,version",
-            },
-        )
-        filtered_size = len(str(filtered_result.data))
-
-        # Filtered should be significantly smaller (60-80% reduction)
-        reduction = (full_size - filtered_size) / full_size
-        assert reduction > 0.6  # At least 60% reduction
+    # Filtered should be significantly smaller (60-80% reduction)
+    reduction = (full_size - filtered_size) / full_size
+    assert reduction > 0.6  # At least 60% reduction
 
 
+@pytest.mark.network
 @pytest.mark.asyncio
-async def test_repoquery__backward_compat_no_get_keys_param(server):
+async def test_repoquery__backward_compat_no_get_keys_param(client):
     """Old repoquery calls without get_keys should still work."""
-    async with Client(server) as client:
-        result = await client.call_tool(
-            "repoquery",
-            {
-                "subcmd": "depends",
-                "spec": "python",
-                "channel": "conda-forge",
-                "limit": 1,
-                # No get_keys parameter
-            },
+    result = await client.call_tool(
+        "repoquery",
+        {
+            "subcmd": "depends",
+            "spec": "python",
+            "channel": "conda-forge",
+            "limit": 1,
+            # No get_keys parameter
+        },
+    )
+    data = result.data
+    packages = data["result"]["result"]["pkgs"]
+    # Should return all fields by default
+    assert len(packages[0].keys()) >= 15
+
+
+@pytest.mark.parametrize("offset, limit", [(0, 0), (1, 1)])
+def test_repoquery__get_keys__cached_payload_not_mutated(offset, limit):
+    from unittest.mock import patch
+
+    from conda_meta_mcp.tools import repoquery
+
+    pkgs = [{"name": "a", "version": "1"}, {"name": "b", "version": "2"}]
+    raw = {"query": {"query": "x"}, "result": {"status": "OK", "pkgs": list(pkgs)}}
+
+    with patch.object(repoquery, "_cached_raw_query", return_value=raw):
+        payload = repoquery._run_repoquery(
+            "depends", "x", "conda-forge", "linux-64", False, offset, limit, "name"
+        )
+        unfiltered = repoquery._run_repoquery(
+            "depends", "x", "conda-forge", "linux-64", False, 0, 0
+        )
+
+    expected = [{"name": "a"}, {"name": "b"}][offset : (offset + limit) if limit else None]
+    assert payload["result"]["result"]["pkgs"] == expected
+    assert payload["query"]["total"] == 2
+    assert raw["result"]["pkgs"] == pkgs
+    assert unfiltered["result"] is raw
+
+
+def test_repoquery__columnar__one_schema_for_all_rows():
+    from unittest.mock import patch
+
+    from conda_meta_mcp.tools import repoquery
+
+    pkgs = [{"name": "a", "version": "1"}, {"name": "b", "license": "MIT", "version": "2"}]
+    raw = {"query": {"query": "x"}, "result": {"status": "OK", "pkgs": list(pkgs)}}
+
+    with patch.object(repoquery, "_cached_raw_query", return_value=raw):
+        payload = repoquery._run_repoquery(
+            "depends", "x", "conda-forge", "linux-64", False, 0, 0, "", "columnar"
         )
-        data = result.data
-        inner = data.get("result", {})
-        packages = inner.get("pkgs") or inner.get("result", {}).get("pkgs", [])
-        # Should return all fields by default
-        assert len(packages[0].keys()) >= 15
+        projected = repoquery._run_repoquery(
+            "depends", "x", "conda-forge", "linux-64", False, 1, 1, "version", "columnar"
+        )
+        with pytest.raises(ToolError, match="response_format"):
+            repoquery._run_repoquery(
+                "depends", "x", "conda-forge", "linux-64", False, 0, 0, "", "table"
+            )
+
+    assert payload["result"]["result"]["pkgs"] == {
+        "schema": ["name", "version", "license"],
+        "data": [["a", "1", None], ["b", "2", "MIT"]],
+    }
+    assert projected["result"]["result"]["pkgs"] == {"schema": ["version"], "data": [["2"]]}
+    assert raw["result"]["pkgs"] == pkgs
+
+
+def test_repoquery__index__loaded_once_for_depends_and_whoneeds():
+    from unittest.mock import MagicMock, patch
+
+    from conda_meta_mcp.tools import repoquery
+
+    helper = MagicMock()
+    helper.return_value.depends.return_value.to_dict.return_value = {"result": {"pkgs": []}}
+    helper.return_value.whoneeds.return_value.to_dict.return_value = {"result": {"pkgs": []}}
+
+    repoquery._get_index.cache_clear()
+    try:
+        with patch("conda_libmamba_solver.index.LibMambaIndexHelper", helper):
+            for subcmd, tree in [("depends", False), ("depends", True), ("whoneeds", False)]:
+                repoquery._cached_raw_query.__wrapped__(
+                    subcmd, "x", "conda-forge", "linux-64", tree
+                )
+    finally:
+        repoquery._get_index.cache_clear()
+
+    helper.assert_called_once()
+    assert helper.return_value.depends.call_count == 2
+    helper.return_value.whoneeds.assert_called_once()
+
+
+def test_repoquery__unpaginated_large_result__rejected():
+    from unittest.mock import patch
+
+    from conda_meta_mcp.tools import repoquery
+
+    pkgs = [{"name": f"p{i}"} for i in range(repoquery.MAX_UNPAGINATED_PKGS + 1)]
+    raw = {"query": {"query": "x"}, "result": {"status": "OK", "pkgs": pkgs}}
+
+    with patch.object(repoquery, "_cached_raw_query", return_value=raw):
+        with pytest.raises(ToolError, match="Pass limit"):
+            repoquery._run_repoquery("whoneeds", "x", "conda-forge", "linux-64", False, 0, 0)
+        paged = repoquery._run_repoquery("whoneeds", "x", "conda-forge", "linux-64", False, 0, 5)
+        tail = repoquery._run_repoquery("whoneeds", "x", "conda-forge", "linux-64", False, 1, 0)
+
+    assert len(paged["result"]["result"]["pkgs"]) == 5
+    assert len(tail["result"]["result"]["pkgs"]) == repoquery.MAX_UNPAGINATED_PKGS